@@ -3,6 +3,8 @@ import random
 import os
 import logging
 import time
+import inspect
+import asyncio
 from time import sleep
 
 from .compat import *
@@ -19,14 +21,23 @@ from .test import (
     skip_unless,
     expected_failure,
     expect_failure,
+    profile_test,
 )
 from .threading import ThreadingData
 from .client import ClientData
 from .output import OutputData
 from .path import PathData
 from .service import ServiceData
-from .mocking import MockData, Mock
+from .mocking import (
+    MockData,
+    Mock,
+    FastMock,
+    SpecMock,
+    Spy,
+    FaultInjector,
+)
 from .server import ServerData
+from .clock import ClockData, VirtualClock
 from .types.string import StringData
 from .types.number import NumberData
 from .types.sequence import SequenceData
@@ -73,21 +84,97 @@ class TestdataData(TestData):
         cb_args=None,
         cb_kwargs=None,
         timeout=30.0,
-        interval=0.1
+        interval=0.1,
+        **kwargs
     ):
         """
         keep running callback(*cb_args, **cb_kwargs) until it returns True or
         timeout is reached
 
+        The wait between checks starts small and backs off until it reaches
+        interval, so conditions that become true quickly are noticed quickly
+
         :param callback: callable, the function to call, should return
             True/False
         :param cb_args: list, any callback arguments
         :param cb_kwargs: dict, any callback keyword arguments
         :param timeout: float, how long you should wait before failing with
             RuntimeError
-        :param interval: float, sleep for this interval inbetween callback
+        :param interval: float, the most seconds to sleep inbetween callback
             calls
+        :param **kwargs:
+            * event: threading.Event|threading.Condition, if passed in then
+                callback is checked again as soon as the event is set or the
+                condition is notified instead of waiting the full interval,
+                the event isn't cleared so once it is set the waits between
+                checks are normal sleeps again
+            * backoff: float, each wait is this many times longer than the
+                last, 1.0 means always wait interval, defaults to 2.0
+            * min_interval: float, the first wait when backoff is on,
+                defaults to 0.001
+            * jitter: float, randomize each wait by up to this fraction of
+                the wait (eg, 0.1 is +/-10%) so many waiters don't all check
+                at the same time
         """
+        cb_args, cb_kwargs = self._get_wait_args(cb_args, cb_kwargs)
+        event = kwargs.pop("event", None)
+
+        deadline = time.monotonic() + timeout if timeout else None
+        intervals = self._get_wait_intervals(interval, **kwargs)
+        while not callback(*cb_args, **cb_kwargs):
+            delay = self._get_wait_delay(intervals, deadline, timeout)
+
+            if event is None or self._is_event_set(event):
+                time.sleep(delay)
+
+            elif hasattr(event, "notify"):
+                with event:
+                    event.wait(delay)
+
+            else:
+                event.wait(delay)
+
+    async def async_wait(
+        self,
+        callback,
+        cb_args=None,
+        cb_kwargs=None,
+        timeout=30.0,
+        interval=0.1,
+        **kwargs
+    ):
+        """The async version of .wait(), callback can be a normal function or
+        an async function
+
+        :param event: asyncio.Event, see .wait()
+        :param **kwargs: see .wait()
+        """
+        cb_args, cb_kwargs = self._get_wait_args(cb_args, cb_kwargs)
+        event = kwargs.pop("event", None)
+
+        async def check():
+            ret = callback(*cb_args, **cb_kwargs)
+            if inspect.isawaitable(ret):
+                ret = await ret
+            return ret
+
+        deadline = time.monotonic() + timeout if timeout else None
+        intervals = self._get_wait_intervals(interval, **kwargs)
+        while not await check():
+            delay = self._get_wait_delay(intervals, deadline, timeout)
+
+            if event is None or self._is_event_set(event):
+                await asyncio.sleep(delay)
+
+            else:
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+
+                except asyncio.TimeoutError:
+                    pass
+    wait_async = async_wait
+
+    def _get_wait_args(self, cb_args, cb_kwargs):
         if cb_args is None:
             cb_args = []
 
@@ -98,15 +185,48 @@ class TestdataData(TestData):
         if not cb_kwargs:
             cb_kwargs = {}
 
-        start = time.time()
-        while not callback(*cb_args, **cb_kwargs):
-            time.sleep(interval)
-            if timeout:
-                stop = time.time()
-                if (stop - start) >= timeout:
-                    raise RuntimeError(
-                        "wait() timed out after {} seconds".format(timeout)
-                    )
+        return cb_args, cb_kwargs
+
+    def _is_event_set(self, event):
+        """Returns True if event is an event that has already been set,
+        waiting on it would return right away"""
+        is_set = getattr(event, "is_set", None)
+        return is_set() if is_set else False
+
+    def _get_wait_intervals(
+        self,
+        interval,
+        backoff=2.0,
+        min_interval=0.001,
+        jitter=0.0
+    ):
+        """Yields how long each wait should be"""
+        delay = min(min_interval, interval) if backoff > 1.0 else interval
+        while True:
+            if jitter:
+                yield delay * random.uniform(1.0 - jitter, 1.0 + jitter)
+
+            else:
+                yield delay
+
+            delay = min(delay * backoff, interval)
+
+    def _get_wait_delay(self, intervals, deadline, timeout):
+        """Returns the next wait, never waiting past the deadline
+
+        :raises: RuntimeError if the deadline has passed
+        """
+        delay = next(intervals)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(
+                    "wait() timed out after {} seconds".format(timeout)
+                )
+
+            delay = min(delay, remaining)
+
+        return delay
 
     def wait_for(self, timeout):
         """Equivalent to time.sleep(timeout)
@@ -32,6 +32,10 @@ class TestDataFinder(ClassFinder):
     inserted_modules = False
     """Flag for autodiscover and prefix loading"""
 
+    version = 0
+    """Incremented every time a class is added or removed, so anything that
+    caches attributes found on the instances knows when to throw them away"""
+
     def __set_name__(cls, owner, name):
         """Tricksy way to get the root TestData instance and use that as
         the cutoff class"""
@@ -56,6 +60,45 @@ class TestDataFinder(ClassFinder):
                 environ.get("AUTODISCOVER_NAME"),
             )
 
+    def add_class(self, klass):
+        self.hooks = {}
+        self.version += 1
+        super().add_class(klass)
+
+    def delete_class(self, klass):
+        self.hooks = {}
+        self.version += 1
+        super().delete_class(klass)
+
+    def delete_mro(self, klass):
+        self.hooks = {}
+        self.version += 1
+        super().delete_mro(klass)
+
+    def get_hooks(self, *names):
+        """Returns the hook methods (eg, `TestData.get_setups`) of the
+        absolute TestData instances
+
+        This is called for every test, so the hooks are only found once and
+        then cached until a class is added or removed, and only the
+        instances that override a hook are returned since most TestData
+        classes don't have any hooks
+
+        :param *names: str, the hook method names, for each instance the
+            overridden hooks are returned in the order of the names
+        :returns: list[Callable], the bound hook methods
+        """
+        hooks = self.__dict__.setdefault("hooks", {})
+        if names not in hooks:
+            hooks[names] = []
+            for pathkeys, node in self.leaves():
+                for name in names:
+                    default = getattr(self.cutoff_class, name)
+                    if getattr(type(node.value), name) is not default:
+                        hooks[names].append(getattr(node.value, name))
+
+        return hooks[names]
+
     def get_abs_instances(self):
         """Go through all the absolute TestData instances (these are the
         edges/leaves of the class hierarchy"""
@@ -336,13 +379,16 @@ class TestData(object):
 
         :param name: str, the requested attribute name
         """
-        # see __findattr__ to see where self._missing_cache is checked
-        self._missing_cache.add(name)
-
         if name.startswith("_"):
+            # this has to be checked before ._missing_cache is touched
+            # because things like pickle will look for private attributes
+            # before .__init__ has been called
             return super().__getattr__(name)
 
         else:
+            # see __findattr__ to see where self._missing_cache is checked
+            self._missing_cache.add(name)
+
             # magic resolution is only supported for non magic/private
             # attributes
             return self.__findattr__(name)
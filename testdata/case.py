@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""The wrappers around unittest's internal TestCase._call* methods
+
+unittest cuts a failure's traceback at the first unittest frame after the
+test's own frames, a frame is a unittest frame if its module has a
+`__unittest` global, so the wrappers live in this module and set it, that way
+failures still point at the line in the test that failed instead of at these
+wrappers
+"""
+import sys
+import time
+
+from .compat import *
+
+
+__unittest = True
+
+
+class _TestCaseCallMixin(object):
+    """Times (and profiles) each part of a test, see `.test._TestCaseMixin`
+    for the rest of the timing and profiling methods"""
+    def _callTestMethod(self, method):
+        profiler = self._getProfiler(method)
+        if profiler:
+            try:
+                profiler.start()
+
+            except ValueError as e:
+                # cProfile can't be enabled while another profiler is active
+                # (eg, the whole test run is being profiled) so the test runs
+                # unprofiled
+                sys.stderr.write(f"\nNot profiling {self.id()}: {e}\n")
+                profiler = None
+
+        start = time.perf_counter_ns()
+        try:
+            return super()._callTestMethod(method)
+
+        finally:
+            if profiler:
+                profiler.stop()
+
+            self._addTiming("test", start)
+            if profiler:
+                path = profiler.write(self.id())
+                sys.stderr.write(
+                    f"\nProfile of {self.id()} written to {path}\n"
+                    f"{profiler.summary()}\n"
+                )
+
+    def _callTearDown(self):
+        start = time.perf_counter_ns()
+        try:
+            return super()._callTearDown()
+
+        finally:
+            self._addTiming("tearDown", start)
+
+    def _callCleanup(self, function, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return super()._callCleanup(function, *args, **kwargs)
+
+        finally:
+            if function in self.__dict__.get("_data_cleanups", ()):
+                self._addTiming("data_cleanups", start)
+
+            else:
+                self._addTiming("cleanups", start)
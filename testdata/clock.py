@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+import asyncio.base_events
+from contextlib import contextmanager
+
+from .compat import *
+from .base import TestData
+
+
+###############################################################################
+# Supporting classes and methods
+###############################################################################
+class VirtualClock(object):
+    """A clock that only moves forward when something sleeps
+
+    While a clock is running, the `time` module's clock and sleep functions
+    and the asyncio event loop's clock use this clock, so code that polls
+    with `time.sleep` (eg `TestdataData.wait`) or waits with `asyncio.sleep`
+    finishes instantly but still sees the same amount of time pass
+
+    The monotonic clocks continue from their real values when the clock
+    starts, so deadlines computed before the clock started are still valid,
+    but when the clock stops they go back to the real clocks, which are
+    behind by however much virtual time passed, so anything scheduled in
+    virtual time (eg, an asyncio timer) that outlives the clock will fire
+    that much later
+
+    Be aware that names imported from the time module (eg,
+    `from time import sleep`) before the clock started won't be virtual, and
+    virtual time doesn't give other threads or processes any more real time
+    to finish their work
+
+    :example:
+        with testdata.virtual_clock() as clock:
+            start = time.time()
+            time.sleep(60)
+            print(time.time() - start) # 60.0
+    """
+    functions = [
+        "time",
+        "time_ns",
+        "monotonic",
+        "monotonic_ns",
+        "perf_counter",
+        "perf_counter_ns",
+        "sleep",
+    ]
+    """The time module functions that are replaced while the clock runs"""
+
+    running = None
+    """The clock that is currently running, there can only be one"""
+
+    def __init__(self, start=None):
+        """
+        :param start: float, the unix timestamp the clock starts at, defaults
+            to the real time
+        """
+        self.originals = {}
+        self.real_sleep = time.sleep
+
+        self.lock = threading.Lock()
+        self.epoch = time.time() if start is None else start
+        self.elapsed = 0.0
+
+        # the real monotonic clocks when the clock started, see .start
+        self.monotonic_start = time.monotonic()
+        self.perf_counter_start = time.perf_counter()
+
+    def time(self):
+        return self.epoch + self.elapsed
+
+    def time_ns(self):
+        return int(self.time() * 1_000_000_000)
+
+    def monotonic(self):
+        return self.monotonic_start + self.elapsed
+
+    def monotonic_ns(self):
+        return int(self.monotonic() * 1_000_000_000)
+
+    def perf_counter(self):
+        return self.perf_counter_start + self.elapsed
+
+    def perf_counter_ns(self):
+        return int(self.perf_counter() * 1_000_000_000)
+
+    def sleep(self, seconds):
+        """Advance the clock instead of sleeping, other threads still get a
+        chance to run"""
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+
+        self.advance(seconds)
+        self.real_sleep(0)
+
+    def advance(self, seconds):
+        """Move the clock forward seconds"""
+        with self.lock:
+            self.elapsed += seconds
+
+    def loop_run_once(self, loop):
+        """Called each iteration of an event loop, if there is nothing ready
+        to run then the clock jumps to the next scheduled callback instead of
+        the loop blocking until that callback's time"""
+        if not loop._ready and loop._scheduled:
+            when = loop._scheduled[0]._when
+            now = self.monotonic()
+            if when > now:
+                self.advance(when - now)
+
+    def start(self):
+        if VirtualClock.running:
+            raise RuntimeError("A virtual clock is already running")
+
+        VirtualClock.running = self
+
+        self.monotonic_start = time.monotonic()
+        self.perf_counter_start = time.perf_counter()
+
+        for name in self.functions:
+            self.originals[name] = getattr(time, name)
+            setattr(time, name, getattr(self, name))
+
+        loop_class = asyncio.base_events.BaseEventLoop
+        self.originals["loop_time"] = loop_class.time
+        self.originals["loop_run_once"] = loop_class._run_once
+
+        clock = self
+        run_once = loop_class._run_once
+        def _run_once(loop):
+            clock.loop_run_once(loop)
+            return run_once(loop)
+
+        loop_class.time = lambda loop: clock.monotonic()
+        loop_class._run_once = _run_once
+
+    def stop(self):
+        for name in self.functions:
+            setattr(time, name, self.originals[name])
+
+        loop_class = asyncio.base_events.BaseEventLoop
+        loop_class.time = self.originals["loop_time"]
+        loop_class._run_once = self.originals["loop_run_once"]
+
+        self.originals = {}
+        VirtualClock.running = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+###############################################################################
+# testdata functions
+###############################################################################
+class ClockData(TestData):
+    @contextmanager
+    def virtual_clock(self, start=None):
+        """Context manager that runs the code inside it with a VirtualClock,
+        sleeps and timeouts take no real time
+
+        :example:
+            with testdata.virtual_clock():
+                # this returns instantly, but 30 virtual seconds passed
+                with self.assertRaises(RuntimeError):
+                    testdata.wait(lambda: False, timeout=30)
+
+        :param start: float, see VirtualClock
+        :returns: VirtualClock
+        """
+        with VirtualClock(start) as clock:
+            yield clock
+    fake_clock = virtual_clock
+    mock_clock = virtual_clock
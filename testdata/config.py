@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 import tempfile
 
 from datatypes import Environ, Bool
@@ -26,6 +27,57 @@ environ.setdefault("TEMPDIR", tempfile.gettempdir())
 environ.setdefault("DATA_DIR", "")
 
 
+# how many data files `.path.PathData.find_data` and friends will keep the
+# contents of in memory, files bigger than DATA_CACHE_FILE_SIZE bytes are
+# read every time and are never cached
+environ.setdefault("DATA_CACHE_SIZE", 128, type=int)
+environ.setdefault("DATA_CACHE_FILE_SIZE", 1048576, type=int)
+
+
+# how many compiled code objects the in memory modules created with
+# `.path.PathData.create_module` will keep, modules with identical source
+# reuse the compiled code instead of compiling it again
+environ.setdefault("CODE_CACHE_SIZE", 512, type=int)
+
+
+# how many calls a `.mocking.Spy` will remember, older calls are overwritten
+# but are still counted
+environ.setdefault("SPY_SIZE", 10000, type=int)
+
+
+# `.test.TestCase.assertBenchmark` compares against the json baseline file
+# that it is given, set this to True to save the new timings as the baseline
+# instead
+environ.setdefault("BENCHMARK_SAVE", False, type=Bool)
+
+
+# `.test.TestCase` times every test's setups, body, and cleanups, set this to
+# a path and a json report of the slowest TIMINGS_COUNT tests will be written
+# there when the test run finishes
+environ.setdefault("TIMINGS_PATH", "")
+environ.setdefault("TIMINGS_COUNT", 20, type=int)
+
+
+# profile every test, set to "cprofile" (or 1) to profile with cProfile and
+# write pstats files or "sample" to sample the stacks and write collapsed
+# stack files, the files are written to PROFILE_DIR and named after the test
+# id. Single tests can be profiled with `.profiling.profile_test`.
+# PROFILE_COUNT is how many functions are summarized in the test output and
+# PROFILE_INTERVAL is the seconds between samples when sampling
+environ.setdefault("PROFILE", "")
+environ.setdefault(
+    "PROFILE_DIR",
+    os.path.join(environ.TEMPDIR, "testdata_profiles")
+)
+environ.setdefault("PROFILE_COUNT", 10, type=int)
+environ.setdefault("PROFILE_INTERVAL", 0.001, type=float)
+
+
+# set in the worker processes of `.runner` to the worker's index (0, 1, ...),
+# empty when the tests aren't running in parallel
+environ.setdefault("WORKER", "")
+
+
 # the default encoding for things (not fully supported/used throughout the
 # codebase), added 9-2018
 environ.setdefault("ENCODING", "UTF-8", type=lambda x: x.upper())
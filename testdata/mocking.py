@@ -2,15 +2,24 @@
 import types
 import inspect
 import sys
+import linecache
 import importlib
+import importlib.util
 import os
 import copy
 import functools
+import time
+import bisect
+import weakref
+import random
+import threading
+import asyncio
 from contextlib import contextmanager
 from collections.abc import Callable
 from typing import Any
 
 from .compat import *
+from .config import environ
 from .base import TestData
 
 
@@ -41,6 +50,15 @@ class Mock(object):
         m = Mock(foo=ValueError("the error you want to raise"))
         m.foo(1, 2) # raises ValueError
     """
+    _fast = False
+    """If True then non-callable attributes are always wrapped so they can be
+    called, otherwise the calling line is checked to see if the attribute is
+    being called, see FastMock"""
+
+    _mock_attr_classes = {}
+    """Holds the wrapper class for every type that has been wrapped, see
+    ._get_mock_attr"""
+
     def __init__(self, patches=None, **kwargs_patches):
         self._patch(patches, **kwargs_patches)
 
@@ -84,42 +102,57 @@ class Mock(object):
                 self._raise_if_error(v)
 
                 if not hasattr(v, "__call__"):
-
-                    frames = inspect.stack()
-                    frame = frames[1]
-                    loc = "\n".join(frame[4]) if frame[4] else ["REPL"]
+                    if self._fast:
+                        return self._get_mock_attr(v)
+
+                    # only the line that accessed the attribute is needed,
+                    # inspect.stack() would read the source of every frame
+                    frame = sys._getframe(1)
+                    loc = linecache.getline(
+                        frame.f_code.co_filename,
+                        frame.f_lineno,
+                    )
                     if ".{}(".format(key) in loc or ".{}".format(key) not in loc:
+                        return self._get_mock_attr(v)
 
-                        # https://stackoverflow.com/questions/2172189/why-i-cant-extend-bool-in-python
-                        not_bool = not self._is_instance(v, bool)
-                        if not_bool:
-                            not_bool = not self._is_subclass(v, bool)
+        return v
 
-                        #not_bool = (not self._is_instance(v, bool) and not self._is_subclass(v, bool))
-                        class_type = type(v) if not_bool else object 
+    def _get_mock_attr(self, v):
+        """Wrap v so it can be used as a value (eg, m.foo) or called like a
+        method (eg, m.foo())"""
+        # https://stackoverflow.com/questions/2172189/why-i-cant-extend-bool-in-python
+        not_bool = not self._is_instance(v, bool)
+        if not_bool:
+            not_bool = not self._is_subclass(v, bool)
 
-                        class MockAttr(class_type):
-                            def __new__(cls, *args, **kwargs):
-                                try:
-                                    return super().__new__(
-                                        cls,
-                                        *args,
-                                        **kwargs
-                                    )
+        class_type = type(v) if not_bool else object 
 
-                                except TypeError:
-                                    return super().__new__(cls)
+        try:
+            mock_attr_class = self._mock_attr_classes[class_type]
 
-                            def __call__(self, *args, **kwargs):
-                                return v
+        except KeyError:
+            class MockAttr(class_type):
+                def __new__(cls, v):
+                    try:
+                        instance = super().__new__(cls, v)
 
-                            def __bool__(self):
-                                return bool(v)
-                            __nonzero__ = __bool__
+                    except TypeError:
+                        instance = super().__new__(cls)
 
-                        return MockAttr(v)
+                    instance._mock_value = v
+                    return instance
 
-        return v
+                def __call__(self, *args, **kwargs):
+                    return self._mock_value
+
+                def __bool__(self):
+                    return bool(self._mock_value)
+                __nonzero__ = __bool__
+
+            mock_attr_class = MockAttr
+            self._mock_attr_classes[class_type] = mock_attr_class
+
+        return mock_attr_class(v)
 
     def _patch(self, patches=None, **kwargs_patches):
         if not patches: patches = {}
@@ -154,10 +187,812 @@ class Mock(object):
         return False
 
 
+class SpecMock(Mock):
+    """Base class for the mocks created by `MockData.mock_spec`
+
+    Only the attributes of the spec class exist, and calling a method
+    validates the arguments against the real method's signature, so the mock
+    can't drift from the class it is standing in for
+    """
+    __getattribute__ = object.__getattribute__
+
+    _spec_ref = None
+    """weakref to the real class, this is weak so the cached mock classes
+    don't keep the real classes alive, see `MockData._spec_classes`"""
+
+    _signatures = None
+    """dict[str, inspect.Signature|None], every attribute of _spec, the value
+    is None if the attribute isn't a method"""
+
+    _spec_patches = None
+    """dict[str, Any], the patched values, see ._patch"""
+
+    _spec_ignore = set([
+        "__init__",
+        "__new__",
+        "__del__",
+        "__getattribute__",
+        "__getattr__",
+        "__setattr__",
+        "__delattr__",
+        "__dir__",
+        "__init_subclass__",
+        "__subclasshook__",
+        "__class_getitem__",
+        "__repr__",
+        "__str__",
+        "__format__",
+        "__hash__",
+        "__eq__",
+        "__ne__",
+        "__lt__",
+        "__le__",
+        "__gt__",
+        "__ge__",
+        "__reduce__",
+        "__reduce_ex__",
+        "__getstate__",
+        "__setstate__",
+        "__copy__",
+        "__deepcopy__",
+        "__sizeof__",
+        "__get__",
+        "__set__",
+        "__delete__",
+        "__set_name__",
+    ])
+    """The magic methods of the spec class that aren't mocked, these are
+    needed for the mock itself to work like a normal object"""
+
+    _spec_defaults = {
+        "__len__": lambda: 0,
+        "__length_hint__": lambda: 0,
+        "__bool__": lambda: True,
+        "__contains__": lambda: False,
+        "__iter__": lambda: iter(()),
+        "__reversed__": lambda: iter(()),
+    }
+    """What the mocked magic methods return when they aren't patched, the
+    other methods return the mock itself, but python checks the return value
+    of these"""
+
+    @property
+    def _spec(self):
+        """The real class"""
+        return self._spec_ref()
+
+    @property
+    def __class__(self):
+        # this makes isinstance(mock, _spec) return True
+        return self._spec
+
+    def __getattr__(self, key):
+        """Only called when the attribute doesn't exist, so this handles
+        patched values that aren't methods"""
+        if key.startswith("__"):
+            raise AttributeError(key)
+
+        patches = self._spec_patches
+        if key in patches:
+            v = patches[key]
+            self._raise_if_error(v)
+            return v
+
+        if key in self._signatures:
+            return self
+
+        raise AttributeError(
+            f"{self._spec.__name__} mock has no attribute {key}"
+        )
+
+    def _patch(self, patches=None, **kwargs_patches):
+        if not patches: patches = {}
+        patches.update(kwargs_patches)
+        for k in patches.keys():
+            if k not in self._signatures:
+                raise AttributeError(
+                    f"{self._spec.__name__} has no attribute {k} to mock"
+                )
+
+        self._spec_patches = patches
+
+    @classmethod
+    def create_spec_class(cls, spec):
+        """Reflect spec and create a SpecMock child class with a validating
+        method for each of spec's methods
+
+        :param spec: type
+        :returns: type[SpecMock]
+        """
+        signatures = {}
+        class_dict = {
+            "_spec_ref": weakref.ref(spec),
+            "_signatures": signatures,
+        }
+
+        if not cls.is_spec_magic(spec, "__call__"):
+            # instances of spec can't be called, so neither can the mock
+            class_dict["__call__"] = cls.create_spec_method("__call__", False)
+
+        for name in dir(spec):
+            if name.startswith("__"):
+                if name in cls._spec_ignore or not cls.is_spec_magic(spec, name):
+                    continue
+
+            elif name.startswith("_") and hasattr(cls, name):
+                # this would replace the mock's own internals (eg, ._patch)
+                continue
+
+            raw = inspect.getattr_static(spec, name)
+            if isinstance(raw, staticmethod):
+                func = raw.__func__
+                bound = False
+
+            elif isinstance(raw, classmethod):
+                func = raw.__func__
+                bound = True
+
+            elif inspect.isroutine(raw):
+                func = raw
+                bound = True
+
+            else:
+                signatures[name] = None
+                continue
+
+            try:
+                sig = inspect.signature(func)
+
+            except (TypeError, ValueError):
+                # builtins might not have a signature, accept anything
+                sig = None
+
+            else:
+                if bound:
+                    params = list(sig.parameters.values())[1:]
+                    sig = sig.replace(parameters=params)
+
+            signatures[name] = sig
+            class_dict[name] = cls.create_spec_method(name, sig)
+
+        return type(f"{spec.__name__}SpecMock", (cls,), class_dict)
+
+    @classmethod
+    def is_spec_magic(cls, spec, name):
+        """Returns True if name is a magic method spec (or one of its parents
+        besides object) defines"""
+        for klass in spec.__mro__:
+            if klass is not object and name in vars(klass):
+                return inspect.isroutine(vars(klass)[name])
+
+        return False
+
+    @classmethod
+    def create_spec_method(cls, name, sig):
+        """Create the method that stands in for spec's name method
+
+        :param name: str, the method name
+        :param sig: inspect.Signature|None|bool, the arguments are checked
+            against this, if None any arguments are accepted and if False the
+            method raises TypeError like a missing magic method would
+        :returns: callable
+        """
+        def method(self, *args, **kwargs):
+            if sig is False:
+                raise TypeError(
+                    f"{self._spec.__name__} mock is not callable"
+                )
+
+            elif sig is not None:
+                # raises TypeError if the arguments don't match
+                sig.bind(*args, **kwargs)
+
+            patches = self._spec_patches
+            if name in patches:
+                v = patches[name]
+                self._raise_if_error(v)
+                if callable(v):
+                    return v(*args, **kwargs)
+
+                return v
+
+            if name in self._spec_defaults:
+                return self._spec_defaults[name]()
+
+            return self
+
+        method.__name__ = name
+        method.__signature__ = sig or None
+        return method
+
+
+def is_routine(v):
+    """Returns True if v is a function or method, spies count as functions"""
+    return inspect.isroutine(v) or isinstance(v, Spy)
+
+
+class CallRecord(object):
+    """Holds the information of one call to a Spy, see CallRecorder"""
+    __slots__ = (
+        "args",
+        "kwargs",
+        "start",
+        "stop",
+        "return_value",
+        "exception",
+        "raised",
+        "offset",
+    )
+
+    @property
+    def latency(self):
+        """How long the call took in seconds"""
+        return self.stop - self.start
+
+    @property
+    def timestamp(self):
+        """When the call started, as a unix timestamp"""
+        return self.start + self.offset
+
+
+class CallRecorder(object):
+    """A bounded ring buffer of CallRecord instances
+
+    All the records are created up front and are reused when the buffer
+    wraps, so recording a call doesn't allocate anything and a function called
+    millions of times only ever holds the last maxsize calls. The total call
+    count is kept for all calls though
+    """
+    def __init__(self, maxsize=0, returns=False):
+        """
+        :param maxsize: int, how many calls to remember, defaults to
+            environ.SPY_SIZE
+        :param returns: bool, True if the return value, or the raised
+            exception, of each call should be kept, this is off by default
+            because it keeps the return values and the exceptions (and all
+            the frames of their tracebacks) from being garbage collected. The
+            class of a raised exception is always kept in .raised
+        """
+        self.maxsize = maxsize or environ.SPY_SIZE
+        self.returns = returns
+        self.records = [CallRecord() for _ in range(self.maxsize)]
+        # perf_counter is used for the call times because it is fast and
+        # monotonic, this converts it to a unix timestamp
+        self.offset = time.time() - time.perf_counter()
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.maxsize)
+
+    def __iter__(self):
+        return self.calls()
+
+    def record(self, args, kwargs, start, stop, return_value, exception):
+        r = self.records[self.count % self.maxsize]
+        r.args = args
+        r.kwargs = kwargs
+        r.start = start
+        r.stop = stop
+        r.return_value = return_value if self.returns else None
+        r.exception = exception if self.returns else None
+        r.raised = None if exception is None else type(exception)
+        r.offset = self.offset
+        self.count += 1
+
+    def calls(self):
+        """Iterate the remembered calls, oldest first
+
+        :returns: generator[CallRecord]
+        """
+        start = max(0, self.count - self.maxsize)
+        for i in range(start, self.count):
+            yield self.records[i % self.maxsize]
+
+    @property
+    def last(self):
+        """Returns the most recent CallRecord or None if there haven't been
+        any calls"""
+        if self.count:
+            return self.records[(self.count - 1) % self.maxsize]
+
+    def called_with(self, *args, **kwargs):
+        """Returns how many of the remembered calls had exactly args and
+        kwargs"""
+        return sum(
+            1 for r in self.calls() if r.args == args and r.kwargs == kwargs
+        )
+
+    def latencies(self):
+        """Returns the latency of every remembered call
+
+        :returns: list[float]
+        """
+        return [r.stop - r.start for r in self.calls()]
+
+    def histogram(self, buckets=None):
+        """Count the remembered calls by latency
+
+        :param buckets: list[float], the upper bounds of each bucket in
+            seconds, defaults to powers of 10 from a microsecond to a second
+        :returns: dict[float, int], the key is the upper bound of the bucket
+            and the value is how many calls took at most that long but longer
+            than the previous bucket, calls longer than every bucket are
+            counted under float("inf")
+        """
+        if not buckets:
+            buckets = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0]
+
+        buckets = sorted(buckets)
+        if buckets[-1] != float("inf"):
+            buckets.append(float("inf"))
+
+        ret = {b: 0 for b in buckets}
+        for latency in self.latencies():
+            ret[buckets[bisect.bisect_left(buckets, latency)]] += 1
+
+        return ret
+
+    def reset(self):
+        self.count = 0
+
+
+class Spy(object):
+    """Wraps a callable and records every call to it
+
+    :example:
+        spy = testdata.spy(foo)
+        spy(1, 2)
+        spy.count # 1
+        spy.last.args # (1, 2)
+    """
+    def __init__(self, func=None, maxsize=0, returns=False):
+        """
+        :param func: callable, the wrapped callable, if None then the spy
+            returns None
+        :param maxsize: int, see CallRecorder
+        :param returns: bool, see CallRecorder
+        """
+        if func is not None:
+            functools.update_wrapper(self, func)
+
+        self.func = func
+        self.recorder = CallRecorder(maxsize=maxsize, returns=returns)
+
+        self.is_async = inspect.iscoroutinefunction(func)
+        if self.is_async and hasattr(inspect, "markcoroutinefunction"):
+            # so inspect.iscoroutinefunction(self) is True
+            inspect.markcoroutinefunction(self)
+
+    def __call__(self, *args, **kwargs):
+        if self.is_async:
+            return self.acall(*args, **kwargs)
+
+        exception = None
+        return_value = None
+        start = time.perf_counter()
+        try:
+            return_value = self.call(*args, **kwargs)
+            return return_value
+
+        except BaseException as e:
+            exception = e
+            raise
+
+        finally:
+            self.recorder.record(
+                args,
+                kwargs,
+                start,
+                time.perf_counter(),
+                return_value,
+                exception,
+            )
+
+    async def acall(self, *args, **kwargs):
+        """The async version of __call__, this is what is used when func is
+        an async function"""
+        exception = None
+        return_value = None
+        start = time.perf_counter()
+        try:
+            return_value = await self.async_call(*args, **kwargs)
+            return return_value
+
+        except BaseException as e:
+            exception = e
+            raise
+
+        finally:
+            self.recorder.record(
+                args,
+                kwargs,
+                start,
+                time.perf_counter(),
+                return_value,
+                exception,
+            )
+
+    def call(self, *args, **kwargs):
+        """Call the wrapped func, this is what is timed and recorded"""
+        if self.func is not None:
+            return self.func(*args, **kwargs)
+
+    async def async_call(self, *args, **kwargs):
+        """Await the wrapped func, this is what is timed and recorded"""
+        if self.func is not None:
+            return await self.func(*args, **kwargs)
+
+    def __get__(self, instance, owner=None):
+        """Spies set on a class work like methods"""
+        if instance is None:
+            return self
+        return types.MethodType(self, instance)
+
+    def __bool__(self):
+        # a spy that hasn't been called yet is still truthy
+        return True
+
+    def __len__(self):
+        return len(self.recorder)
+
+    def __iter__(self):
+        return self.recorder.calls()
+
+    def __getattr__(self, name):
+        # CallRecorder's query methods (eg, .count, .histogram())
+        if name == "recorder":
+            raise AttributeError(name)
+        return getattr(self.recorder, name)
+
+
+class FaultInjector(Spy):
+    """Wraps a callable to make it slow, unreliable, and limited, like a real
+    service under load
+
+    All the calls are recorded, see Spy, so the latency histogram includes
+    the injected latency and any time spent waiting for a concurrency slot,
+    calls rejected because of the concurrency limit are recorded also
+
+    :example:
+        # fail 10% of the time and take ~100ms
+        f = FaultInjector(
+            foo,
+            latency=0.1,
+            distribution="normal",
+            stddev=0.02,
+            error_rate=0.1,
+        )
+    """
+    def __init__(
+        self,
+        func=None,
+        latency=0.0,
+        distribution="fixed",
+        error_rate=0.0,
+        error=None,
+        concurrency=0,
+        reject=False,
+        seed=None,
+        **kwargs
+    ):
+        """
+        :param func: callable, the wrapped callable, can be sync or async
+        :param latency: float|callable, seconds to wait before func is called,
+            this is the mean for a normal distribution and the scale (minimum)
+            for a pareto distribution, if callable it is called each time and
+            should return the seconds
+        :param distribution: str, one of fixed, normal, or pareto
+        :param error_rate: float, between 0.0 and 1.0, the chance a call will
+            raise error instead of calling func
+        :param error: BaseException|type, what will be raised, defaults to
+            ConnectionError
+        :param concurrency: int, how many calls can run at the same time, 0
+            means unlimited
+        :param reject: bool, if True then calls over the concurrency limit
+            will raise error, otherwise they wait for a slot
+        :param seed: Any, seed for the random values so runs can be
+            reproduced
+        :param **kwargs:
+            * stddev: float, the standard deviation of a normal distribution,
+                defaults to latency / 4
+            * alpha: float, the shape of a pareto distribution, defaults to 3,
+                smaller values have longer tails
+            * maxsize: int, see Spy
+            * returns: bool, see Spy
+        """
+        super().__init__(
+            func,
+            maxsize=kwargs.pop("maxsize", 0),
+            returns=kwargs.pop("returns", False),
+        )
+
+        if distribution not in ["fixed", "normal", "pareto"]:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+
+        self.latency = latency
+        self.distribution = distribution
+        self.stddev = kwargs.pop("stddev", None)
+        self.alpha = kwargs.pop("alpha", 3.0)
+        self.error_rate = error_rate
+        self.error = error or ConnectionError
+        self.concurrency = concurrency
+        self.reject = reject
+        self.random = random.Random(seed)
+
+        self.active = 0
+        self.max_active = 0
+        self.rejected = 0
+        # the counts can be updated from multiple threads
+        self.lock = threading.Lock()
+
+        self.semaphore = None
+        if concurrency and not self.is_async:
+            self.semaphore = threading.BoundedSemaphore(concurrency)
+
+        # an asyncio semaphore is bound to the first loop that waits on it,
+        # so every running loop gets its own, see .get_async_semaphore
+        self.async_semaphores = weakref.WeakKeyDictionary()
+
+    def get_async_semaphore(self):
+        """Returns the concurrency semaphore for the running event loop, or
+        None if there is no concurrency limit"""
+        if self.concurrency:
+            loop = asyncio.get_running_loop()
+            semaphore = self.async_semaphores.get(loop, None)
+            if semaphore is None:
+                semaphore = asyncio.BoundedSemaphore(self.concurrency)
+                self.async_semaphores[loop] = semaphore
+
+            return semaphore
+
+    def get_latency(self):
+        """Returns how many seconds the next call should wait"""
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency and self.distribution == "normal":
+            stddev = latency / 4 if self.stddev is None else self.stddev
+            latency = max(0.0, self.random.gauss(latency, stddev))
+
+        elif latency and self.distribution == "pareto":
+            latency = latency * self.random.paretovariate(self.alpha)
+
+        return latency
+
+    def get_error(self):
+        """Returns the error the call should raise or None"""
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self.create_error()
+
+    def create_error(self):
+        error = self.error
+        if isinstance(error, type):
+            error = error(f"Injected {error.__name__}")
+
+        return error
+
+    def start_call(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def stop_call(self):
+        with self.lock:
+            self.active -= 1
+
+    def reject_call(self):
+        with self.lock:
+            self.rejected += 1
+
+        raise self.create_error()
+
+    def call(self, *args, **kwargs):
+        # the concurrency slot is acquired here, instead of in __call__, so
+        # the time spent waiting for it is part of the recorded latency
+        if self.semaphore is not None:
+            if not self.semaphore.acquire(blocking=not self.reject):
+                self.reject_call()
+
+        try:
+            self.start_call()
+            if latency := self.get_latency():
+                time.sleep(latency)
+
+            if error := self.get_error():
+                raise error
+
+            return super().call(*args, **kwargs)
+
+        finally:
+            self.stop_call()
+            if self.semaphore is not None:
+                self.semaphore.release()
+
+    async def async_call(self, *args, **kwargs):
+        semaphore = self.get_async_semaphore()
+        if semaphore is not None:
+            if self.reject and semaphore.locked():
+                self.reject_call()
+
+            await semaphore.acquire()
+
+        try:
+            self.start_call()
+            if latency := self.get_latency():
+                await asyncio.sleep(latency)
+
+            if error := self.get_error():
+                raise error
+
+            return await super().async_call(*args, **kwargs)
+
+        finally:
+            self.stop_call()
+            if semaphore is not None:
+                semaphore.release()
+
+
+class FastMock(Mock):
+    """A Mock that doesn't look at the calling code
+
+    Non-callable attributes are always returned wrapped so `m.foo` and
+    `m.foo()` both work, this makes attribute access much faster but the
+    values will be instances of a subclass of the value's type (eg,
+    `type(m.foo) is int` will be False)
+    """
+    _fast = True
+
+    def __getattribute__(self, key):
+        try:
+            v = object.__getattribute__(self, key)
+
+        except AttributeError:
+            return self
+
+        else:
+            if v is not None and not key.startswith("_"):
+                self._raise_if_error(v)
+
+        return v
+
+    def _patch(self, patches=None, **kwargs_patches):
+        """Wraps the non-callable values once here so attribute access only
+        has to return them"""
+        if not patches: patches = {}
+        patches.update(kwargs_patches)
+        for k, v in patches.items():
+            if v is not None and not hasattr(v, "__call__"):
+                if (
+                    not self._is_instance(v, Exception)
+                    and not self._is_subclass(v, Exception)
+                ):
+                    patches[k] = self._get_mock_attr(v)
+
+        super()._patch(patches)
+
+
 ###############################################################################
 # testdata functions
 ###############################################################################
 class MockData(TestData):
+    # the (path, mtime, size, code) of every module that has been patched,
+    # keyed by module name, see ._get_module_code
+    _module_codes = {}
+
+    # the names of the patched modules that were added to sys.modules, they
+    # are removed when the test is cleaned up
+    _patched_modules = []
+
+    # the SpecMock class of every class passed to .mock_spec
+    _spec_classes = weakref.WeakKeyDictionary()
+
+    def get_cleanups(self):
+        return [(self._cleanup_patched_modules, [], {})]
+
+    def _cleanup_patched_modules(self):
+        """Remove all the patched modules from sys.modules"""
+        while self._patched_modules:
+            sys.modules.pop(self._patched_modules.pop(-1), None)
+
+    def _find_module_file(self, mod_name):
+        """Find the source file of mod_name without importing it
+
+        :param mod_name: str, the full module path
+        :returns: str, the path to the module's source file
+        """
+        # http://stackoverflow.com/questions/4907054/
+        def find_mod_path(p):
+            if '.' in p:
+                p, m = p.rsplit('.', 1)
+                imod_path = find_mod_path(p)
+                mod_path = os.path.join(imod_path, m)
+
+            else:
+                # we fudge the paths a bit to make sure current working
+                # directory is also checked
+                paths = [os.getcwd()]
+                paths.extend(sys.path)
+                spec = importlib.machinery.PathFinder().find_spec(p, paths)
+                if spec is None:
+                    # modules created by testdata aren't in sys.path
+                    spec = importlib.util.find_spec(p)
+
+                if spec.submodule_search_locations:
+                    mod_path = spec.submodule_search_locations[0]
+
+                else:
+                    mod_path = spec.origin
+
+            return mod_path
+
+        mpath = find_mod_path(mod_name)
+
+        mfile = mpath
+        # figure out if we have a package or a module and set the
+        # appropriate file
+        if os.path.isdir(mpath):
+            mfile = os.path.join(mpath, '__init__.py')
+
+        else:
+            if not mfile.endswith(".py"):
+                mfile = '{}.py'.format(mpath)
+
+        return mfile
+
+    def _get_module_code(self, mod):
+        """Returns the source file and compiled code of mod
+
+        Patching the same module over and over is common, so the path and
+        code are cached and are only found and compiled again when the
+        module's file changes
+
+        :param mod: str|ModuleType
+        :returns: tuple[str, types.CodeType]
+        """
+        if inspect.ismodule(mod):
+            mod_name = mod.__name__
+            mfile = inspect.getsourcefile(mod)
+
+        else:
+            mod_name = mod
+            mfile = None
+            if m := sys.modules.get(mod_name, None):
+                mfile = getattr(m, "__file__", None)
+
+        cached = self._module_codes.get(mod_name, None)
+        if cached and (not mfile or mfile == cached[0]):
+            try:
+                st = os.stat(cached[0])
+                if (st.st_mtime_ns, st.st_size) == cached[1:3]:
+                    return cached[0], cached[3]
+
+            except OSError:
+                pass
+
+        if not mfile:
+            mfile = self._find_module_file(mod_name)
+
+        if not os.path.isfile(mfile):
+            # the module doesn't exist on disk (eg, it was created with
+            # create_module(memory=True)) so its loader has the code
+            spec = importlib.util.find_spec(mod_name)
+            return spec.origin, spec.loader.get_code(mod_name)
+
+        if not mfile.endswith(".py"):
+            # we can only compile source files, anything else (eg, an
+            # extension module) will be loaded by its own loader
+            return mfile, None
+
+        with open(mfile, "rb") as fp:
+            st = os.fstat(fp.fileno())
+            code = compile(fp.read(), mfile, "exec", dont_inherit=True)
+
+        self._module_codes[mod_name] = (
+            mfile,
+            st.st_mtime_ns,
+            st.st_size,
+            code,
+        )
+        return mfile, code
+
     def set_instance_property(
         self,
         instance: object,
@@ -265,7 +1100,7 @@ class MockData(TestData):
         for name, patch in patches.items():
             # make sure we have a callable if we need a callable
             o = getattr(mod_patched, name, None)
-            if inspect.isroutine(o) and not inspect.isroutine(patch):
+            if inspect.isroutine(o) and not is_routine(patch):
                 # so I ran into an issue with binding here, the value of patch
                 # was being changed on each iteration and so when I then called
                 # it the final value of patch was being returned instead of the
@@ -291,55 +1126,26 @@ class MockData(TestData):
 
         patches.update(kwargs_patches) # combine both dicts
 
-        # now we need to find the full module path so we can reload it
+        # now we need to find the module's code so we can re-execute it
         if inspect.ismodule(mod):
             mod_name = mod.__name__
-            mpath = inspect.getsourcefile(mod)
-            mfile = mpath
 
         else:
             mod_name = mod
 
-            # http://stackoverflow.com/questions/4907054/
-            def find_mod_path(p):
-                if '.' in p:
-                    p, m = p.rsplit('.', 1)
-                    imod_path = find_mod_path(p)
-                    mod_path = os.path.join(imod_path, m)
-
-                else:
-                    # we fudge the paths a bit to make sure current working
-                    # directory is also checked
-                    paths = [os.getcwd()]
-                    paths.extend(sys.path)
-                    spec = importlib.machinery.PathFinder().find_spec(p, paths)
-                    if spec.submodule_search_locations:
-                        mod_path = spec.submodule_search_locations[0]
-
-                    else:
-                        mod_path = spec.origin
-
-                return mod_path
-
-            mpath = find_mod_path(mod_name)
-
-            mfile = mpath
-            # figure out if we have a package or a module and set the
-            # appropriate file
-            if os.path.isdir(mpath):
-                mfile = os.path.join(mpath, '__init__.py')
-
-            else:
-                if not mfile.endswith(".py"):
-                    mfile = '{}.py'.format(mpath)
-
+        mfile, code = self._get_module_code(mod)
         mname = self.get_module_name(prefix=mod_name)
 
         # https://docs.python.org/3/library/importlib.html#importing-a-source-file-directly
         spec = importlib.util.spec_from_file_location(mname, mfile)
         m = importlib.util.module_from_spec(spec)
         sys.modules[mname] = m
-        spec.loader.exec_module(m)
+        self._patched_modules.append(mname)
+        if code is None:
+            spec.loader.exec_module(m)
+
+        else:
+            exec(code, m.__dict__)
 
         # go through and apply all the patches
         for patch_name, patch in patches.items():
@@ -363,7 +1169,7 @@ class MockData(TestData):
                 # if we're patching a function and patch isn't a function then
                 # make it a function
                 o = getattr(m, patch_name, None)
-                if inspect.isroutine(o) and not inspect.isroutine(patch):
+                if inspect.isroutine(o) and not is_routine(patch):
                     # lambda binding issue, see the explanation in patch_class
                     # why I'm using partial here
                     patch = functools.partial(
@@ -399,6 +1205,128 @@ class MockData(TestData):
 
         return m
 
+    @contextmanager
+    def patching(self, mod, patches=None, **kwargs_patches):
+        """Context manager that patches mod in place and restores the
+        original values when the with statement exits
+
+        Unlike .patch(), nothing is copied, so only the patched attributes are
+        touched and the patches are visible everywhere mod is used. Be aware
+        that names imported from a module (eg `from foo import bar`) before
+        the patch won't see the patched values
+
+        :Example:
+            with testdata.patching("foo.bar", boom=mock_boom) as m:
+                print(m.FooPatch.bam()) # 2
+
+            print(foo.bar.FooPatch.bam()) # 1
+
+        :param mod: string|module|class|instance, the thing you are patching
+        :param patches: dict, see .patch(), keys can be dotted (eg "os.getcwd")
+            to patch an attribute of an attribute
+        :returns: module|object, mod, or the imported module if mod was a
+            string
+        """
+        if not mod:
+            raise ValueError("mod is empty")
+
+        if not patches:
+            patches = {}
+
+        patches.update(kwargs_patches) # combine both dicts
+
+        if isinstance(mod, basestring):
+            mod = importlib.import_module(mod)
+
+        undos = []
+
+        def set_patch(o, name, patch):
+            try:
+                if name == "__class__":
+                    raise TypeError(name)
+
+                had = name in vars(o)
+                orig = vars(o)[name] if had else None
+
+            except TypeError:
+                # object doesn't have a __dict__ (eg, it uses __slots__) or
+                # the attribute doesn't live in the __dict__
+                had = hasattr(o, name)
+                orig = getattr(o, name, None)
+
+            if had:
+                undos.append(functools.partial(setattr, o, name, orig))
+
+            else:
+                undos.append(functools.partial(delattr, o, name))
+
+            setattr(o, name, patch)
+
+        try:
+            for patch_name, patch in patches.items():
+                o = mod
+                parts = patch_name.split(".")
+                name = parts.pop(-1)
+                for i, part in enumerate(parts):
+                    so = getattr(o, part, None)
+                    if so is None:
+                        # same as .patch_module(), missing attributes are
+                        # mocked
+                        name = ".".join(parts[i + 1:] + [name])
+                        set_patch(o, part, Mock(**{name: patch}))
+                        break
+
+                    o = so
+
+                else:
+                    if inspect.ismodule(o) or inspect.isclass(o):
+                        if (
+                            inspect.isroutine(getattr(o, name, None))
+                            and not is_routine(patch)
+                        ):
+                            # lambda binding issue, see the explanation in
+                            # patch_class why I'm using partial here
+                            patch = functools.partial(
+                                lambda *a, **kw: kw["__patch"],
+                                __patch=patch
+                            )
+
+                        set_patch(o, name, patch)
+
+                    else:
+                        val = getattr(o, name, None)
+                        if inspect.isroutine(val) or callable(patch):
+                            if not callable(patch):
+                                patch = functools.partial(
+                                    lambda *a, **kw: kw["__patch"],
+                                    __patch=patch
+                                )
+
+                            set_patch(o, name, types.MethodType(patch, o))
+
+                        elif inspect.isdatadescriptor(
+                            getattr(o.__class__, name, None)
+                        ):
+                            # data descriptors can only be overridden on the
+                            # class, so the instance gets a one-off subclass
+                            # until the with statement exits
+                            set_patch(
+                                o,
+                                "__class__",
+                                type(o.__class__.__name__, (o.__class__,), {
+                                    name: patch,
+                                }),
+                            )
+
+                        else:
+                            set_patch(o, name, patch)
+
+            yield mod
+
+        finally:
+            for undo in reversed(undos):
+                undo()
+
     def mock_class(self, name="", patches=None, **kwargs_patches) -> type[Mock]:
         """create a class with the given method and properties
 
@@ -414,6 +1342,46 @@ class MockData(TestData):
         patches.update(kwargs_patches)
         return type(self.get_classname(name=name), (Mock,), patches)
 
+    def mock_spec_class(self, spec: type) -> type[SpecMock]:
+        """Returns the SpecMock class for spec, spec is only reflected the
+        first time its mock class is requested
+
+        :param spec: type, the real class
+        :returns: type[SpecMock]
+        """
+        try:
+            return self._spec_classes[spec]
+
+        except KeyError:
+            spec_class = SpecMock.create_spec_class(spec)
+            self._spec_classes[spec] = spec_class
+            return spec_class
+
+    def mock_spec(self, spec: type, patches=None, **kwargs_patches) -> SpecMock:
+        """Create a mock of spec that only has spec's attributes and checks
+        the arguments passed to its methods against the real signatures
+
+        :example:
+            class Foo(object):
+                def bar(self, che): pass
+
+            m = testdata.mock_spec(Foo, bar=1)
+            m.bar(1) # 1
+            m.bar() # raises TypeError
+            m.baz # raises AttributeError
+
+        :param spec: type|object, the real class, or an instance of it
+        :param patches: dict, the values to return, callable values are called
+            with the method's arguments
+        :returns: SpecMock, isinstance(returned_value, spec) is True
+        """
+        if not inspect.isclass(spec):
+            spec = type(spec)
+
+        return self.mock_spec_class(spec)(patches, **kwargs_patches)
+    mock_autospec = mock_spec
+    autospec = mock_spec
+
     def mock_instance(self, name="", patches=None, **kwargs_patches) -> Mock:
         """This is the same as mock_class but returns an instance of that class
 
@@ -431,6 +1399,107 @@ class MockData(TestData):
         """
         return Mock(patches, **kwargs_patches)
 
+    def inject(self, func=None, latency=0.0, **kwargs) -> FaultInjector:
+        """Wrap func with injected latency, errors, and concurrency limits,
+        the returned value can be used as a patch value
+
+        :example:
+            # every call to foo.bar takes at least 10ms and 5% of them fail
+            m = testdata.patch(foo, bar=testdata.inject(
+                foo.bar,
+                latency=0.01,
+                distribution="pareto",
+                error_rate=0.05,
+            ))
+
+        :param func: callable, sync or async
+        :param latency: float, see FaultInjector
+        :param **kwargs: see FaultInjector
+        :returns: FaultInjector
+        """
+        return FaultInjector(func, latency=latency, **kwargs)
+    inject_faults = inject
+    fault = inject
+
+    def spy(self, func=None, maxsize=0, returns=False) -> Spy:
+        """Wrap func so all its calls are recorded
+
+        :example:
+            foo = testdata.spy(foo)
+            foo(1)
+            foo.count # 1
+            foo.histogram() # latency counts
+
+        :param func: callable, the function to spy on, it can also be used
+            as a patch value (eg `testdata.patch(Foo, bar=testdata.spy())`)
+        :param maxsize: int, how many calls to keep, see CallRecorder
+        :param returns: bool, True to keep the return values and raised
+            exceptions
+        :returns: Spy
+        """
+        return Spy(func, maxsize=maxsize, returns=returns)
+
+    @contextmanager
+    def spying(self, mod, *names, maxsize=0, returns=False):
+        """Context manager that replaces the names attributes of mod with
+        spies, in place, and restores the originals on exit
+
+        :example:
+            with testdata.spying(foo, "bar", "che") as spies:
+                foo.bar()
+
+            spies["bar"].count # 1
+
+        :param mod: module|class|instance
+        :param *names: str, the attribute names to spy on
+        :param maxsize: int, see .spy
+        :param returns: bool, see .spy
+        :returns: dict[str, Spy]
+        """
+        spies = {}
+        originals = {}
+        for name in names:
+            raw = inspect.getattr_static(mod, name)
+            originals[name] = (name in vars(mod), raw)
+
+            if inspect.isclass(mod) and inspect.isfunction(raw):
+                # plain methods are bound by Spy.__get__
+                spies[name] = Spy(raw, maxsize=maxsize, returns=returns)
+                value = spies[name]
+
+            else:
+                spies[name] = Spy(
+                    getattr(mod, name),
+                    maxsize=maxsize,
+                    returns=returns,
+                )
+                value = spies[name]
+                if inspect.isclass(mod):
+                    # classmethods and staticmethods are already bound
+                    value = staticmethod(value)
+
+            setattr(mod, name, value)
+
+        try:
+            yield spies
+
+        finally:
+            for name, (had, raw) in originals.items():
+                if had:
+                    setattr(mod, name, raw)
+
+                else:
+                    delattr(mod, name)
+
+    def fast_mock(self, patches=None, **kwargs_patches) -> FastMock:
+        """Same as .mock() but the returned object doesn't inspect the calling
+        code on attribute access, use this when mocks are used in hot loops
+
+        :returns: FastMock instance
+        """
+        return FastMock(patches, **kwargs_patches)
+    mock_fast = fast_mock
+
     @contextmanager
     def environ(self, thing=None, **kwargs):
         """Context manager to change the os.environ to something else for the
@@ -1,15 +1,27 @@
 # -*- coding: utf-8 -*-
 import os
+import io
 import re
 import sys
 import pkgutil
 import importlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
 import inspect
 import random
+import time
+import math
+import shutil
+from collections import OrderedDict
 from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import zlib
 import struct
 import textwrap
+import zipfile
+import tarfile
+import gzip
 
 from datatypes.path import (
     TempFilepath,
@@ -89,6 +101,10 @@ class Dirpath(Path, Dirpath):
 
 
 class TempDirpath(Path, TempDirpath):
+    # holds a ModuleIndex for every import directory that has been searched
+    # for modules, see .modpaths
+    _module_indexes = {}
+
     def module(self, module_path):
         return self.get_module(module_path)
 
@@ -125,19 +141,267 @@ class TempDirpath(Path, TempDirpath):
     def modpaths(self):
         """Similar to modules, returns all the modules under this directory as
         Modulepath instances"""
-        for module_info in pkgutil.iter_modules([self.path]):
-            parts = self.relparts + [module_info[1]]
-            yield self.tempmodule_class()(".".join(parts), dir=self.basedir)
+        index = self.get_module_index(self.basedir)
+        prefix = ".".join(p for p in self.relparts if p != ".")
+        for modname in index.find(prefix):
+            if modname != prefix:
+                yield self.tempmodule_class()(modname, dir=self.basedir)
+
+    @classmethod
+    def get_module_index(cls, basedir):
+        """Returns the ModuleIndex for basedir, building it if it doesn't
+        exist or if it has gone stale
 
-            if module_info[2]: # module is a package because index 2 is True
-                submodules = self.tempdir_class()(parts, dir=self.basedir)
-                for submodule in submodules.modpaths():
-                    yield submodule
+        :param basedir: str, an import directory
+        :returns: ModuleIndex
+        """
+        basedir = str(basedir)
+        index = cls._module_indexes.get(basedir, None)
+        if index is None or index.is_stale():
+            index = ModuleIndex(basedir)
+            cls._module_indexes[basedir] = index
+
+        return index
 
     def __contains__(self, pattern):
         return self.has(pattern=pattern)
 
 
+def write_csv_rows(csv, columns, start, stop, default=None, batch_size=1000):
+    """Write rows `start` to `stop` into an open `csv`, buffering
+    `batch_size` rows at a time so they can be written with `writerows`
+
+    This is used by `PathData.create_csv`
+
+    :param csv: CSV, the csv instance, it should already be open for writing
+    :param columns: dict[str, callable|list|Any], see `PathData.create_csv`
+    :param start: int, the index of the first row, this is used to find the
+        row's value in list columns
+    :param stop: int, the index to stop at (not inclusive)
+    :param default: Any, the value used when a list column doesn't have a
+        value for a row
+    :param batch_size: int, how many rows are buffered between writes
+    """
+    items = list(columns.items())
+    batch = []
+    for i in range(start, stop):
+        d = {}
+        for field_name, callback in items:
+            if callable(callback):
+                d[field_name] = callback()
+
+            elif isinstance(callback, list):
+                d[field_name] = callback[i] if i < len(callback) else default
+
+            else:
+                d[field_name] = callback
+
+        if row := csv.create_writer_row(d):
+            batch.append(row)
+
+        if len(batch) >= batch_size:
+            csv.writer.writerows(batch)
+            batch = []
+
+    if batch:
+        csv.writer.writerows(batch)
+
+
+def write_csv_shard(
+    path,
+    fieldnames,
+    columns,
+    start,
+    stop,
+    default=None,
+    batch_size=1000,
+    encoding="",
+):
+    """Write the headerless rows `start` to `stop` into the csv file at
+    `path`, this is the process pool worker used by `PathData.create_csv`"""
+    # forked workers inherit the parent's random state, so without a reseed
+    # every shard would generate the exact same rows
+    random.seed()
+
+    csv = CSV(path, fieldnames=fieldnames, encoding=encoding)
+    with csv:
+        csv.writer.has_header = True
+        write_csv_rows(csv, columns, start, stop, default, batch_size)
+
+
+class DataIndex(object):
+    """Maps the basenames and file roots of every file under a data directory
+    to their paths so `PathData.find_data_file` doesn't have to walk the
+    whole directory on every call
+
+    The index is considered stale, and should be rebuilt, when the mtime of
+    any indexed directory changes, which happens when a file is added,
+    removed, or renamed in that directory
+    """
+    def __init__(self, basedir):
+        self.basedir = basedir
+        self.build()
+
+    def build(self):
+        """Walk .basedir and index all the files"""
+        self.mtimes = {}
+        self.names = {}
+        self.roots = {}
+
+        for dirpath, dirnames, filenames in os.walk(self.basedir):
+            dirnames.sort()
+            self.mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                self.names.setdefault(filename, path)
+
+                # a file like foo.tar.gz will be found by both foo and foo.tar
+                parts = filename.split(".")
+                for i in range(1, len(parts)):
+                    if root := ".".join(parts[:i]):
+                        self.roots.setdefault(root, path)
+
+    def is_stale(self):
+        """Returns True if any of the indexed directories have changed"""
+        for dirpath, mtime in self.mtimes.items():
+            try:
+                if os.stat(dirpath).st_mtime_ns != mtime:
+                    return True
+
+            except OSError:
+                return True
+
+        return False
+
+    def find(self, fileroot):
+        """Return the path matching fileroot exactly or, failing that, the
+        path matching fileroot.*
+
+        :param fileroot: str, a basename (eg foo.txt) or a fileroot (eg, foo)
+        :returns: str|None
+        """
+        return self.names.get(fileroot) or self.roots.get(fileroot)
+
+
+class ModuleIndex(object):
+    """Holds the full name of every module under an import directory so
+    `TempDirpath.modpaths` doesn't have to walk the directory and create
+    intermediate paths on every call
+
+    Modules created with `TempModulepath` are added as they are created,
+    anything else that changes an indexed directory makes the index stale and
+    it is rebuilt the next time it is used
+    """
+    def __init__(self, basedir):
+        self.basedir = basedir
+        self.build()
+
+    def build(self):
+        """Walk .basedir and index all the modules, this finds the same
+        modules `pkgutil.iter_modules` would find"""
+        self.mtimes = {}
+        self.modnames = {}
+        self.walk(self.basedir, [])
+
+    def walk(self, dirpath, parts):
+        self.mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+        for entry in os.scandir(dirpath):
+            name = entry.name
+            if entry.is_dir():
+                if (
+                    name.isidentifier()
+                    and os.path.isfile(os.path.join(entry.path, "__init__.py"))
+                ):
+                    self.modnames[".".join(parts + [name])] = True
+                    self.walk(entry.path, parts + [name])
+
+            elif name.endswith(".py") and name != "__init__.py":
+                name = name[:-3]
+                if name.isidentifier():
+                    self.modnames[".".join(parts + [name])] = False
+
+    def is_stale(self):
+        """Returns True if any of the indexed directories have changed"""
+        for dirpath, mtime in self.mtimes.items():
+            try:
+                if os.stat(dirpath).st_mtime_ns != mtime:
+                    return True
+
+            except OSError:
+                return True
+
+        return False
+
+    def add(self, modpath):
+        """Add modpath, and all its parent packages, to the index, this should
+        only be called if the index wasn't stale before modpath was written
+
+        :param modpath: TempModulepath, a module in .basedir
+        """
+        parts = modpath.modparts
+        dirpath = self.basedir
+        self.mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+        for i in range(1, len(parts)):
+            self.modnames[".".join(parts[:i])] = True
+            dirpath = os.path.join(dirpath, parts[i - 1])
+            self.mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+
+        is_package = modpath.is_package()
+        if is_package:
+            dirpath = os.path.join(dirpath, parts[-1])
+            self.mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+
+        self.modnames[modpath] = is_package
+
+    def find(self, prefix=""):
+        """Returns the module names under prefix, packages come right before
+        their submodules, the same order `TempDirpath.modpaths` has always
+        used
+
+        :param prefix: str, a module path, if empty then all modules are
+            returned
+        :returns: list[str]
+        """
+        if prefix:
+            modnames = (
+                n for n in self.modnames
+                if n == prefix or n.startswith(prefix + ".")
+            )
+
+        else:
+            modnames = self.modnames.keys()
+
+        return sorted(modnames, key=lambda n: n.split("."))
+
+
+class ChunkReader(io.RawIOBase):
+    """Wraps an iterable of bytes chunks so it can be read like a file
+
+    This is used to stream generated data into things like `tarfile` that
+    want a file object, without ever holding all the data in memory
+    """
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.buffer:
+            try:
+                self.buffer = memoryview(next(self.chunks))
+
+            except StopIteration:
+                return 0
+
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+
 class TempFilepath(Path, TempFilepath):
     def run(self, arg_str="", cwd="", environ=None, **kwargs):
         """Treat this file like a script and execute it
@@ -235,13 +499,29 @@ class TempModulepath(TempFilepath):
 
     @classmethod
     def create_as(cls, instance, **kwargs):
+        # the index is only kept current if nothing else has changed its
+        # directories, this has to be checked before the module is written
+        # since writing it changes the directory mtimes
+        indexes = cls.tempdir_class()._module_indexes
+        index = indexes.get(str(instance.basedir), None)
+        if index is not None and index.is_stale():
+            indexes.pop(str(instance.basedir), None)
+            index = None
+
         instance = super().create_as(instance, **kwargs)
 
-        # add the path to the top of the sys path so importing the new module
-        # will work
+        # add the module's import directory to sys.path (only once) and
+        # register it with the finder so it can be removed again when the
+        # test is cleaned up
         make_importable = kwargs.pop("make_importable", True)
-        if make_importable:
-            sys.path.insert(0, instance.basedir) 
+        TempModuleFinder.get_instance().add_module(
+            instance,
+            make_importable=make_importable,
+        )
+
+        # keep the module index current so it doesn't have to be rebuilt
+        if index is not None:
+            index.add(instance)
 
         return instance
 
@@ -332,10 +612,10 @@ class TempModulepath(TempFilepath):
         return self.get_modules()
 
     def get_modules(self):
+        """Import and yield this module and all its submodules"""
         dp = self.tempdir_class()(dir=self.basedir)
-        for m in dp.get_modules():
-            if m.__name__.startswith(self):
-                yield m
+        for modname in dp.get_module_index(self.basedir).find(self):
+            yield dp.get_module(modname)
 
     def is_package(self):
         """returns True if this module is a package (directory with __init__.py
@@ -363,10 +643,585 @@ class TempModulepath(TempFilepath):
         return cmd.run(arg_str, **kwargs)
 
 
+class ModuleFinderMixin(object):
+    """Shared functionality for the testdata finders in sys.meta_path"""
+    instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Returns the installed finder, installing it if needed"""
+        if cls.instance is None:
+            cls.instance = cls()
+
+        if cls.instance not in sys.meta_path:
+            # modules created by testdata take precedence, same as their
+            # import directories being at the front of sys.path
+            sys.meta_path.insert(0, cls.instance)
+
+        return cls.instance
+
+    def __init__(self):
+        # every change is recorded as (key, previous value) so it can be
+        # undone, see .cleanup()
+        self.history = []
+
+    def set_value(self, d, key, value):
+        """Set d[key] = value and remember what d[key] was so .cleanup() can
+        reset it"""
+        self.history.append((key, d.get(key, None)))
+        d[key] = value
+
+    def get_marker(self):
+        """Returns a value that can be passed to .cleanup() to undo everything
+        that was added after this was called"""
+        return len(self.history)
+
+    def cleanup(self, d, marker):
+        """Undo all the modules added since marker and remove them from
+        sys.modules
+
+        :param d: dict, the dict .set_value() was called with
+        :param marker: int, the return value of .get_marker()
+        """
+        keys = set()
+        while len(self.history) > marker:
+            key, value = self.history.pop(-1)
+            keys.add(key)
+            if value is None:
+                d.pop(key, None)
+
+            else:
+                d[key] = value
+
+        if keys:
+            for modname in list(sys.modules.keys()):
+                parts = modname.split(".")
+                for i in range(1, len(parts) + 1):
+                    if ".".join(parts[:i]) in keys:
+                        sys.modules.pop(modname, None)
+                        break
+
+
+class TempModuleLoader(importlib.machinery.SourceFileLoader):
+    """Loads the modules created on disk with TempModulepath
+
+    The source is still read from the module's file, but it is compiled
+    using ModuleFinder's code cache so the same source created over and over
+    (eg, the same module in hundreds of tests) is only compiled once
+    """
+    def get_code(self, fullname):
+        path = self.get_filename(fullname)
+        source = importlib.util.decode_source(self.get_data(path))
+        return ModuleFinder.get_instance().compile_source(source, path)
+
+
+class TempModuleFinder(ModuleFinderMixin, importlib.abc.MetaPathFinder):
+    """Keeps track of the import directories of all the modules created with
+    TempModulepath
+
+    Modules created without a tmpdir are written to one import directory for
+    the whole session (see .get_import_root) that is added to sys.path once,
+    so anything that finds modules using sys.path (eg, pkgutil,
+    importlib.machinery.PathFinder, TestData autodiscovery) finds them and
+    sys.path doesn't grow as more modules are created. The modules a test
+    created in the import root are deleted again when the test is cleaned up
+    (see PathData.get_cleanups) so the next test can reuse their names.
+
+    Any other import directory (eg, the tmpdir passed to create_module or the
+    directory create_modules creates) is added to sys.path also, and the ones
+    added during a test are removed from sys.path when the test is cleaned up
+
+    This is also a finder in sys.meta_path that maps each created top level
+    module name to its import directory, so importing a created module
+    doesn't depend on where its import directory is in sys.path
+    """
+    def __init__(self):
+        super().__init__()
+        self.basedirs = {}
+        self.roots = set()
+        self.syspaths = []
+        self.import_root = ""
+
+    def get_import_root(self):
+        """Returns the session's import directory, it is created, and added
+        to sys.path, the first time this is called
+
+        :returns: str
+        """
+        if not self.import_root:
+            self.import_root = TempDirpath.mktempdir(prefix="testdata-modules-")
+            self.roots.add(self.import_root)
+
+        if self.import_root not in sys.path:
+            sys.path.insert(0, self.import_root)
+
+        return self.import_root
+
+    def add_module(self, modpath, make_importable=True):
+        """Make modpath importable
+
+        :param modpath: TempModulepath
+        :param make_importable: bool, if False then modpath will only be
+            importable if another module has already made its import directory
+            importable (eg, it was created using the tmpdir of another module)
+        """
+        basedir = modpath.basedir
+        if basedir == self.import_root:
+            if self.basedirs.get(modpath.modparts[0], None) == basedir:
+                # names are reused in the import root, so a module with this
+                # name could have been imported already
+                self.invalidate_module(modpath)
+
+        elif make_importable:
+            self.roots.add(basedir)
+            if basedir not in sys.path:
+                sys.path.insert(0, basedir)
+                self.syspaths.append(basedir)
+
+        if basedir in self.roots:
+            self.set_value(self.basedirs, modpath.modparts[0], basedir)
+
+    def invalidate_module(self, modpath):
+        """Make sure the next import of modpath loads the source that was just
+        written"""
+        for modname in list(sys.modules.keys()):
+            if modname == modpath or modname.startswith(f"{modpath}."):
+                sys.modules.pop(modname, None)
+
+        # the directory listings of the import root and of the packages in it
+        # are cached by their FileFinders
+        dirpath = modpath.basedir
+        for part in [""] + modpath.modparts[:-1]:
+            dirpath = os.path.join(dirpath, part)
+            if finder := sys.path_importer_cache.get(dirpath.rstrip("/")):
+                finder.invalidate_caches()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if path is None:
+            basedir = self.basedirs.get(fullname, None)
+            if not basedir:
+                return None
+
+            path = [basedir]
+
+        elif fullname.partition(".")[0] not in self.basedirs:
+            # submodules are found using their parent package's __path__
+            return None
+
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path, target)
+        if spec and type(spec.loader) is importlib.machinery.SourceFileLoader:
+            spec.loader = TempModuleLoader(spec.loader.name, spec.loader.path)
+
+        return spec
+
+    def get_marker(self):
+        return (super().get_marker(), len(self.syspaths))
+
+    def cleanup(self, marker):
+        """Undo all the modules added since marker, this also deletes the
+        modules created in the import root and removes any import directories
+        added to sys.path since marker"""
+        # the modules that didn't exist in the import root before marker
+        created = {}
+        for key, value in self.history[marker[0]:]:
+            created.setdefault(key, value != self.import_root)
+
+        super().cleanup(self.basedirs, marker[0])
+
+        if self.import_root:
+            for key, deleted in created.items():
+                if deleted and self.basedirs.get(key) != self.import_root:
+                    path = os.path.join(self.import_root, key)
+                    if os.path.isdir(path):
+                        shutil.rmtree(path, ignore_errors=True)
+
+                    elif os.path.isfile(f"{path}.py"):
+                        os.unlink(f"{path}.py")
+
+            if finder := sys.path_importer_cache.get(self.import_root):
+                finder.invalidate_caches()
+
+        while len(self.syspaths) > marker[1]:
+            basedir = self.syspaths.pop(-1)
+            try:
+                sys.path.remove(basedir)
+
+            except ValueError:
+                pass
+
+
+class ModuleFinder(
+    ModuleFinderMixin,
+    importlib.abc.MetaPathFinder,
+    importlib.abc.InspectLoader
+):
+    """Finds and loads testdata modules whose source is held in memory
+
+    This is used by `PathData.create_module` when `memory=True`, the modules
+    never touch the disk and `sys.path` never grows because there is only
+    ever one instance of this class and it lives in `sys.meta_path`
+
+    https://docs.python.org/3/library/importlib.html#importlib.abc.MetaPathFinder
+    https://docs.python.org/3/library/importlib.html#importlib.abc.InspectLoader
+    """
+    root = "<testdata>"
+    """Prefix of the fake filenames given to the in memory modules, the
+    filenames are needed so tracebacks and inspect.getsource work"""
+
+    def __init__(self):
+        super().__init__()
+        self.sources = {}
+
+        # LRU cache of compiled code, keyed by the source, see
+        # .get_code()
+        self.code_cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def add_module(self, fullname, source, is_package=False):
+        """Add a module that can then be imported
+
+        Any parent modules that don't exist will be added as empty packages
+        and any parent modules that do exist will be converted to packages
+
+        :param fullname: str, the full module path (eg, foo.bar)
+        :param source: str, the python source of the module
+        :param is_package: bool, True if the module is a package
+        """
+        parts = fullname.split(".")
+        for i in range(1, len(parts)):
+            parent = ".".join(parts[:i])
+            if parent in self.sources:
+                if not self.sources[parent][1]:
+                    self.set_value(
+                        self.sources,
+                        parent,
+                        (self.sources[parent][0], True),
+                    )
+                    sys.modules.pop(parent, None)
+
+            else:
+                self.set_value(self.sources, parent, ("", True))
+
+        if fullname in self.sources:
+            is_package = is_package or self.sources[fullname][1]
+
+        self.set_value(self.sources, fullname, (source, is_package))
+
+        # a module created with the same name as a previous module should
+        # see the new source when it is imported
+        sys.modules.pop(fullname, None)
+
+    def get_names(self, prefix=""):
+        """Yield all the module names under prefix, including prefix
+
+        :param prefix: str, the module path prefix, empty yields all modules
+        :returns: generator[str]
+        """
+        for fullname in sorted(self.sources.keys()):
+            if (
+                not prefix
+                or fullname == prefix
+                or fullname.startswith(prefix + ".")
+            ):
+                yield fullname
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in self.sources:
+            return importlib.util.spec_from_loader(
+                fullname,
+                self,
+                origin=self.get_filename(fullname),
+                is_package=self.is_package(fullname),
+            )
+
+    def get_filename(self, fullname):
+        parts = fullname.split(".")
+        if self.is_package(fullname):
+            parts.append("__init__.py")
+
+        else:
+            parts[-1] += ".py"
+
+        return "/".join([self.root] + parts)
+
+    def is_package(self, fullname):
+        try:
+            return self.sources[fullname][1]
+
+        except KeyError as e:
+            raise ImportError(fullname, name=fullname) from e
+
+    def get_source(self, fullname):
+        try:
+            return self.sources[fullname][0]
+
+        except KeyError as e:
+            raise ImportError(fullname, name=fullname) from e
+
+    def get_code(self, fullname):
+        return self.compile_source(
+            self.get_source(fullname),
+            self.get_filename(fullname),
+        )
+
+    def compile_source(self, source, filename):
+        """Compile source, or reuse the code of a module that had the exact
+        same source
+
+        This is also used by TempModuleLoader for the modules on disk
+
+        :param source: str, the python source of the module
+        :param filename: str, the path of the module
+        :returns: types.CodeType
+        """
+        cache = self.code_cache
+        if source in cache:
+            self.hits += 1
+            cache.move_to_end(source)
+            code = self.replace_filename(cache[source], filename)
+
+        else:
+            self.misses += 1
+            code = self.source_to_code(source, filename)
+            cache[source] = code
+            while len(cache) > environ.CODE_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return code
+
+    def replace_filename(self, code, filename):
+        """Returns code, and all the code it contains (eg, functions and
+        classes), with filename set so tracebacks point to the right
+        module"""
+        if code.co_filename == filename:
+            return code
+
+        consts = tuple(
+            self.replace_filename(c, filename) if inspect.iscode(c) else c
+            for c in code.co_consts
+        )
+        return code.replace(co_filename=filename, co_consts=consts)
+
+    def cache_info(self):
+        """Returns the code cache's statistics
+
+        :returns: dict[str, int], with keys hits, misses, size, and maxsize
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.code_cache),
+            "maxsize": environ.CODE_CACHE_SIZE,
+        }
+
+    def cache_clear(self):
+        """Empty the code cache and reset its statistics"""
+        self.code_cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def exec_module(self, module):
+        module.__file__ = self.get_filename(module.__name__)
+        super().exec_module(module)
+
+    def cleanup(self, marker):
+        super().cleanup(self.sources, marker)
+
+
+class MemoryModulepath(String):
+    """The in memory version of TempModulepath, this is what
+    `PathData.create_module` returns when `memory=True`
+
+    The module source is held by the `ModuleFinder` so it can be imported
+    like any other module. Because subprocesses can't see it, .run() writes
+    the module out to disk first
+    """
+    @property
+    def modparts(self):
+        return self.split('.')
+
+    @property
+    def finder(self):
+        return ModuleFinder.get_instance()
+
+    @property
+    def path(self):
+        return self.finder.get_filename(self)
+
+    @classmethod
+    def prepare_text(cls, data, **kwargs):
+        """Normalize data the same way TempModulepath does before it is
+        written to disk
+
+        :param data: str|list[str], the module source
+        :param **kwargs:
+            * header: str|list[str], added to the start of data
+            * footer: str|list[str], added to the end of data
+        :returns: str
+        """
+        if isinstance(data, basestring):
+            data = textwrap.dedent(data)
+
+        else:
+            data = "\n".join(data)
+
+        for k in ["header", "footer"]:
+            if v := kwargs.get(k, ""):
+                if not isinstance(v, basestring):
+                    v = "\n".join(v)
+
+                data = f"{v}\n{data}" if k == "header" else f"{data}\n{v}"
+
+        if not data.endswith("\n"):
+            data += "\n"
+
+        return data
+
+    def read_text(self):
+        return self.finder.get_source(self)
+
+    def is_package(self):
+        return self.finder.is_package(self)
+
+    def module(self):
+        return self.get_module()
+
+    def get_module(self, module_path=""):
+        """Return the actual module this Modulepath represents"""
+        if module_path:
+            module_path = ".".join([self, module_path])
+
+        else:
+            module_path = self
+
+        return importlib.import_module(module_path)
+
+    def modpaths(self):
+        """Yield this module and all its submodules as MemoryModulepath
+        instances"""
+        for fullname in self.finder.get_names(self):
+            yield type(self)(fullname)
+
+    def modules(self):
+        return self.get_modules()
+
+    def get_modules(self):
+        for modpath in self.modpaths():
+            yield modpath.get_module()
+
+    def classes(self):
+        return self.get_classes()
+
+    def get_classes(self):
+        """Return all the classes this module contains"""
+        for m in self.get_modules():
+            for klass_name, klass in inspect.getmembers(m, inspect.isclass):
+                yield klass
+
+    def to_disk(self, tmpdir=""):
+        """Write this module, and all its submodules, to disk
+
+        :param tmpdir: str, the import directory the modules will be written
+            to
+        :returns: TempModulepath
+        """
+        basedir = TempDirpath(dir=tmpdir)
+        finder = self.finder
+
+        # only the top level module knows everything that needs to be written
+        # so parent packages will be correct
+        for fullname in finder.get_names(self.modparts[0]):
+            TempModulepath(
+                fullname,
+                data=finder.get_source(fullname),
+                dir=basedir,
+                is_package=finder.is_package(fullname),
+                make_importable=False,
+            )
+
+        return TempModulepath(self, dir=basedir, make_importable=False)
+
+    def run(self, arg_str="", cwd="", environ=None, **kwargs):
+        """Write this module to disk and then run it on the command line
+
+        see TempModulepath.run
+        """
+        return self.to_disk().run(
+            arg_str,
+            cwd=cwd,
+            environ=environ,
+            **kwargs
+        )
+
+
+class MemoryDirpath(object):
+    """Stands in for the TempDirpath that `PathData.create_modules` returns
+    when `memory=True`, it gives access to all the created modules"""
+    def __init__(self, modpaths):
+        self.modpaths_list = list(modpaths)
+
+    def module(self, module_path):
+        return self.get_module(module_path)
+
+    def get_module(self, module_path):
+        return importlib.import_module(module_path)
+
+    def modpath(self, module_path):
+        return MemoryModulepath(module_path)
+
+    def modpaths(self):
+        seen = set()
+        for modpath in self.modpaths_list:
+            # like a directory, this contains the top level packages
+            for mp in MemoryModulepath(modpath.modparts[0]).modpaths():
+                if mp not in seen:
+                    seen.add(mp)
+                    yield mp
+
+    def modules(self):
+        return self.get_modules()
+
+    def get_modules(self):
+        for modpath in self.modpaths():
+            yield modpath.get_module()
+
+
 ###############################################################################
 # testdata functions
 ###############################################################################
 class PathData(TestData):
+
+    # holds a DataIndex for every data directory that has been searched,
+    # see .find_data_file
+    _data_indexes = {}
+
+    # LRU cache of data file contents, see .find_data
+    _data_cache = OrderedDict()
+
+    def get_setups(self):
+        return [(self._mark_modules, [], {})]
+
+    def get_cleanups(self):
+        return [(self._cleanup_modules, [], {})]
+
+    def _mark_modules(self):
+        """Remember what modules existed before the test ran"""
+        self._module_markers = (
+            TempModuleFinder.get_instance().get_marker(),
+            ModuleFinder.get_instance().get_marker(),
+        )
+
+    def _cleanup_modules(self):
+        """Remove all the modules the test created from the finders and from
+        sys.modules, modules created outside the test (eg, in setUpClass) are
+        left alone"""
+        markers = getattr(self, "_module_markers", None)
+        if markers:
+            TempModuleFinder.get_instance().cleanup(markers[0])
+            ModuleFinder.get_instance().cleanup(markers[1])
+            self._module_markers = None
+
     def _make_png(self, width, height, color=None):
         """Make a png image of arbitrary width, height, and color
 
@@ -556,6 +1411,107 @@ class PathData(TestData):
         return TempFilepath(path, encoding=encoding, dir=tmpdir, **kwargs)
     get_f = get_file
 
+    def create_large_file(
+        self,
+        size,
+        content="zeros",
+        path="",
+        tmpdir="",
+        chunk_size=1048576,
+        ratio=0.3,
+        **kwargs
+    ):
+        """Create a file of `size` bytes without building the contents in
+        memory first
+
+        :Example:
+            # a 10GB upload fixture that takes up no actual disk space
+            f = testdata.create_large_file(10 * 1024 ** 3, "sparse")
+
+        :param size: int, how many bytes the file should be
+        :param content: str, one of:
+            * zeros: the file is allocated with `os.posix_fallocate` (falls
+                back to `os.truncate`) and will read back as null bytes
+            * sparse: the file is extended with `os.truncate`, on most
+                filesystems this doesn't take up any actual blocks
+            * random: the file is filled with `random.randbytes` in
+                `chunk_size` chunks
+            * compressible: the file is filled in `chunk_size` chunks that
+                are part random and part repeated bytes so it will compress
+                to about `ratio` of its size (see .get_compressible_chunks)
+        :param path: str, the path relative to tmpdir, default is randomly
+            generated
+        :param tmpdir: str, the temp directory to use as a base/prefix
+        :param chunk_size: int, how many bytes are written at a time for the
+            random and compressible content
+        :param ratio: float, the compression ratio for compressible content
+        :param **kwargs: passed through to TempFilepath
+        :returns: TempFilepath
+        """
+        kwargs.setdefault("ext", "bin")
+        path = TempFilepath(path, dir=tmpdir, encoding=None, **kwargs)
+
+        if content == "sparse":
+            os.truncate(path, size)
+
+        elif content == "zeros":
+            if size and hasattr(os, "posix_fallocate"):
+                with open(path, "r+b") as fp:
+                    try:
+                        os.posix_fallocate(fp.fileno(), 0, size)
+
+                    except OSError:
+                        # some filesystems (eg, tmpfs on older kernels)
+                        # don't support fallocate
+                        os.truncate(path, size)
+
+            else:
+                os.truncate(path, size)
+
+        elif content == "random":
+            with open(path, "wb") as fp:
+                remaining = size
+                while remaining > 0:
+                    n = min(chunk_size, remaining)
+                    fp.write(random.randbytes(n))
+                    remaining -= n
+
+        elif content == "compressible":
+            with open(path, "wb") as fp:
+                chunks = self.get_compressible_chunks(size, ratio, chunk_size)
+                for chunk in chunks:
+                    fp.write(chunk)
+
+        else:
+            raise ValueError(f"Unknown large file content: {content}")
+
+        return path
+    create_big_file = create_large_file
+
+    def create_compressible_file(
+        self,
+        size,
+        ratio=0.3,
+        path="",
+        tmpdir="",
+        **kwargs
+    ):
+        """Create a file of `size` bytes that zlib will compress to roughly
+        `ratio` of its size
+
+        see .create_large_file and .get_compressible_chunks
+
+        :returns: TempFilepath
+        """
+        return self.create_large_file(
+            size,
+            "compressible",
+            path=path,
+            tmpdir=tmpdir,
+            ratio=ratio,
+            **kwargs
+        )
+
     def create_script(self, *args, **kwargs):
         """Similar to create_file() but will set permission to 777"""
         mode = kwargs.pop("mode", 777)
@@ -571,10 +1527,24 @@ class PathData(TestData):
         encoding="",
         header=True,
         default=None,
+        rows=0,
+        processes=0,
+        batch_size=1000,
         **kwargs
     ):
         """Create a csv file using the generators/callbacks found in columns
 
+        Rows are generated and written in batches of `batch_size` so even
+        hundreds of millions of rows never have to be in memory at once
+
+        :Example:
+            # 100 million rows split across 8 processes
+            csv = testdata.create_csv(
+                {"foo": testdata.get_int, "bar": testdata.get_words},
+                rows=100_000_000,
+                processes=8,
+            )
+
         :param columns: dict|list
             * dict[str, callable], where the callback can generate a value
                 for the row, so something like "foo": testdata.get_name
@@ -586,18 +1556,31 @@ class PathData(TestData):
                 row of the csv
             * list[str], each item in the list is a key will be randomly
                 given a callback to generate the csv
-        :param path: string, the path relative to tmpdir, default is randomly
-            generated
+        :param path: str|io.IOBase, the path relative to tmpdir, default is
+            randomly generated, if this is a stream then the csv will be
+            written to the stream instead of a file
         :param tmpdir: string, the temp directory to use as a base/prefix
         :param encoding: string, the encoding to use for the csv file
         :param header: bool, True (default) if you want the column names to
             be the first line in the file
         :param default: str|int|None, the default value if the column is
             missing a value
+        :param rows: int, how many rows you want, this is the same as passing
+            in `count`, if it isn't passed in then a random amount of rows
+            will be generated for callback columns
+        :param processes: int, if greater than 1 the rows will be split into
+            this many shards that are generated in a process pool and then
+            concatenated, the callbacks in `columns` need to be picklable
+            (eg, no lambdas) for this to work
+        :param batch_size: int, how many rows are buffered before they are
+            written with `writerows`
         :param **kwargs: dict, these will get passed to csv.DictWriter,
             https://docs.python.org/3/library/csv.html#csv.DictWriter
         :returns: testdata.path.CSVpath instance
         """
+        if rows:
+            kwargs["count"] = rows
+
         if isinstance(columns, list):
             d = {}
 
@@ -637,55 +1620,303 @@ class PathData(TestData):
 
         fieldnames = list(columns.keys())
 
-        count = self.get_size(**kwargs)
+        # the sizing keywords are only for .get_size, passing something like
+        # count into TempFilepath would create a path with count parts
+        size_kwargs = {}
+        for k in list(kwargs.keys()):
+            if k == "count" or k.startswith(("default_", "min_", "max_")):
+                size_kwargs[k] = kwargs.pop(k)
+
+        count = self.get_size(**size_kwargs)
+
+        if not isinstance(path, io.IOBase):
+            kwargs.setdefault("ext", "csv")
+            path = TempFilepath(path, dir=tmpdir, encoding=encoding, **kwargs)
+
+        csv = CSV(path, fieldnames=fieldnames, encoding=encoding)
+
+        if processes > 1 and count >= processes:
+            shards = []
+            shard_size = math.ceil(count / processes)
+            for start in range(0, count, shard_size):
+                shards.append((
+                    TempFilepath(ext="csv", encoding=csv.encoding),
+                    start,
+                    min(start + shard_size, count),
+                ))
+
+            with ProcessPoolExecutor(processes) as executor:
+                futures = [
+                    executor.submit(
+                        write_csv_shard,
+                        shard_path,
+                        fieldnames,
+                        columns,
+                        start,
+                        stop,
+                        default,
+                        batch_size,
+                        csv.encoding,
+                    ) for shard_path, start, stop in shards
+                ]
 
-        kwargs.setdefault("ext", "csv")
-        path = TempFilepath(path, dir=tmpdir, encoding=encoding, **kwargs)
-        csv = CSV(path, fieldnames=fieldnames)
-        with csv:
-            csv.writer.has_header = not header
+                for future in futures:
+                    future.result()
 
-            for i in range(count):
-                d = {}
-                for field_name, callback in columns.items():
-                    if callable(callback):
-                        d[field_name] = callback()
+            with csv.writing() as stream:
+                if header:
+                    csv.create_writer(stream).writeheader()
 
-                    elif isinstance(callback, list):
-                        if i < len(callback):
-                            d[field_name] = callback[i]
+                for shard_path, _, _ in shards:
+                    with shard_path.open_text() as fp:
+                        shutil.copyfileobj(fp, stream)
 
-                        else:
-                            d[field_name] = default
+                    shard_path.delete()
 
-                    else:
-                        d[field_name] = callback
+        else:
+            with csv:
+                if header:
+                    csv.writer.writeheader()
+                csv.writer.has_header = True
 
-                csv.add(d)
+                write_csv_rows(csv, columns, 0, count, default, batch_size)
 
         return csv
 
-    def get_csv(self, *args, **kwargs):
+    def get_csv(self, columns, **kwargs):
         """Wrapper around .create_csv but returns the csv body, because
         sometimes you just need the csv contents and don't care at all about
         the actual file
 
-        :param *args: see .create_csv
-        :param **kwargs: see .create_csv
+        The csv is written to an in-memory stream so nothing touches the
+        disk (unless `processes` is used)
+
+        :param columns: see .create_csv
+        :param **kwargs: see .create_csv, path and tmpdir are ignored
         :returns: str, the csv contents, nothing else
         """
-        csv = self.create_csv(*args, **kwargs)
-        return csv.read_text()
+        kwargs.pop("tmpdir", None)
+        kwargs["path"] = io.StringIO(newline="")
+        self.create_csv(columns, **kwargs)
+        return kwargs["path"].getvalue()
 
-    def create_image(self, image_type="", path="", tmpdir=""):
-        """Creates an image using the images founc in the data/ directory
+    def create_archive(
+        self,
+        members=None,
+        format="zip",
+        path="",
+        tmpdir="",
+        total_size=0,
+        content="",
+        chunk_size=65536,
+        encoding="",
+    ):
+        """Create an archive, each member is streamed straight into the
+        archive so none of the members are ever staged on disk
+
+        :Example:
+            # 10 text and image files in a zip
+            f = testdata.create_archive(10)
+
+            # a zip bomb like archive, 1GB of zeros that compresses to ~1MB
+            f = testdata.create_archive(
+                1,
+                total_size=1024 ** 3,
+                content="zeros",
+            )
+
+            # specific members, values can be bytes, str, callables, or
+            # iterables/generators of bytes|str chunks
+            f = testdata.create_archive(
+                {"foo/bar.txt": "bar", "che.bin": (b"1" for _ in range(10))},
+                format="tar.gz",
+            )
+
+        :param members: None|int|Mapping, if None then a random amount of
+            members will be generated, if an int then that many members will
+            be generated, if a Mapping then the keys are the member names and
+            the values are the member contents
+        :param format: str, one of zip, tar, tar.gz (tgz), tar.bz2, tar.xz, or
+            gz (gz can only contain one member)
+        :param path: str, the path relative to tmpdir, default is randomly
+            generated
+        :param tmpdir: str, the temp directory to use as a base/prefix
+        :param total_size: int, for generated members this is how many bytes
+            (uncompressed) all the members will add up to, it is split evenly
+            between the members, image members always have their natural size
+        :param content: str, for generated members, one of text, image,
+            random, or zeros, if empty each member will randomly be text or
+            an image
+        :param chunk_size: int, generated members are written in chunks of
+            this size
+        :param encoding: str, used to encode any str member contents
+        :returns: TempFilepath, the archive
+        """
+        modes = {
+            "zip": (".zip", ""),
+            "tar": (".tar", "w|"),
+            "tar.gz": (".tar.gz", "w|gz"),
+            "tgz": (".tgz", "w|gz"),
+            "tar.bz2": (".tar.bz2", "w|bz2"),
+            "tar.xz": (".tar.xz", "w|xz"),
+            "gz": (".gz", ""),
+        }
+
+        format = format.lower()
+        if format not in modes:
+            raise ValueError(f"Unsupported archive format: {format}")
+
+        ext, mode = modes[format]
+        encoding = encoding or environ.ENCODING
+
+        if path:
+            if not path.lower().endswith(ext):
+                path += ext
+        else:
+            path = self.get_filename(ext=ext)
+
+        archive = self.create_file(path=path, tmpdir=tmpdir, encoding=None)
+
+        if members is None:
+            members = 1 if format == "gz" else self.get_size(1, 10)
+
+        if isinstance(members, int):
+            members = self._get_archive_members(
+                members,
+                total_size=total_size,
+                content=content,
+                chunk_size=chunk_size,
+            )
+
+        else:
+            members = (
+                (name, *self._get_archive_chunks(data, encoding))
+                for name, data in members.items()
+            )
+
+        if format == "zip":
+            with zipfile.ZipFile(
+                archive,
+                "w",
+                compression=zipfile.ZIP_DEFLATED,
+            ) as zf:
+                for name, size, chunks in members:
+                    force_zip64 = size is None or size >= zipfile.ZIP64_LIMIT
+                    with zf.open(name, "w", force_zip64=force_zip64) as fp:
+                        for chunk in chunks:
+                            fp.write(chunk)
+
+        elif format == "gz":
+            with gzip.open(archive, "wb") as fp:
+                for i, (name, size, chunks) in enumerate(members):
+                    if i > 0:
+                        raise ValueError("gz archives can only have 1 member")
+
+                    for chunk in chunks:
+                        fp.write(chunk)
+
+        else:
+            with tarfile.open(archive, mode) as tf:
+                for name, size, chunks in members:
+                    if size is None:
+                        # tar needs to know the size of a member before it
+                        # is written so unsized chunks have to be buffered
+                        data = b"".join(chunks)
+                        size = len(data)
+                        chunks = [data]
+
+                    tarinfo = tarfile.TarInfo(name)
+                    tarinfo.size = size
+                    tarinfo.mtime = int(time.time())
+                    tf.addfile(tarinfo, ChunkReader(chunks))
+
+        return archive
+    create_archive_file = create_archive
+
+    def _get_archive_members(self, count, total_size, content, chunk_size):
+        """Internal method. Generates `count` (name, size, chunks) tuples for
+        .create_archive"""
+        for i in range(count):
+            member_content = content or random.choice(["text", "image"])
+
+            if member_content == "image":
+                data, ext = self.get_image_data()
+                yield self.get_filename(ext=ext), len(data), [data]
+
+            else:
+                if total_size:
+                    size = total_size // count
+                    if i == count - 1:
+                        size += total_size % count
+
+                else:
+                    size = self.get_int(1, chunk_size)
+
+                ext = "txt" if member_content == "text" else "bin"
+                yield (
+                    self.get_filename(ext=ext),
+                    size,
+                    self._get_content_chunks(size, member_content, chunk_size),
+                )
+
+    def _get_archive_chunks(self, data, encoding):
+        """Internal method. Normalizes member data passed into
+        .create_archive to a (size, chunks) tuple, size is None if it can't
+        be known without consuming chunks"""
+        if callable(data):
+            data = data()
+
+        if isinstance(data, str):
+            data = data.encode(encoding)
+
+        if isinstance(data, (bytes, bytearray)):
+            return len(data), [data]
+
+        return None, (
+            chunk.encode(encoding) if isinstance(chunk, str) else chunk
+            for chunk in data
+        )
+
+    def _get_content_chunks(self, size, content, chunk_size):
+        """Internal method. Yields bytes chunks that add up to exactly `size`
+        bytes
+
+        :param size: int, the total bytes that will be yielded
+        :param content: str, one of text, random, or zeros
+        :param chunk_size: int, the max size of each chunk
+        """
+        remaining = size
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            if content == "zeros":
+                chunk = b"\x00" * n
+
+            elif content == "random":
+                chunk = random.randbytes(n)
+
+            elif content == "text":
+                lines = []
+                length = 0
+                while length < n:
+                    line = self.get_words().encode("UTF-8") + b"\n"
+                    lines.append(line)
+                    length += len(line)
+                chunk = b"".join(lines)[:n]
+
+            else:
+                raise ValueError(f"Unknown content: {content}")
+
+            yield chunk
+            remaining -= n
+
+    def get_image_data(self, image_type=""):
+        """Returns the raw bytes of one of the images found in the data/
+        directory without writing anything to disk
 
         :param image_type: string, the type of image you want, one of jpg, png,
             gif, agif, ico
-        :param path: string, the path or basename (eg, foo/bar.jpg or che) of
-            the image
-        :param tmpdir: Dirpath, same as create_module() tmpdir
-        :returns: Filepath, the path to the image file
+        :returns: tuple[bytes, str], the image contents and the image's
+            extension (eg, ".png")
         """
         images = [
             (set(["jpg", "jpeg"]), ".jpg", "static.jpg"),
@@ -710,6 +1941,20 @@ class PathData(TestData):
             "data/{}".format(image)
         )
 
+        return data, ext
+
+    def create_image(self, image_type="", path="", tmpdir=""):
+        """Creates an image using the images founc in the data/ directory
+
+        :param image_type: string, the type of image you want, one of jpg, png,
+            gif, agif, ico
+        :param path: string, the path or basename (eg, foo/bar.jpg or che) of
+            the image
+        :param tmpdir: Dirpath, same as create_module() tmpdir
+        :returns: Filepath, the path to the image file
+        """
+        data, ext = self.get_image_data(image_type)
+
         if path:
             if not path.lower().endswith(ext):
                 path += ext
@@ -846,14 +2091,21 @@ class PathData(TestData):
         :param data: str|list|Mapping, the contents of the module
         :param modpath: str, something like foo.bar
         :param tmpdir: str, the temp directory that will be added to the
-            syspath if make_importable is True
+            syspath if make_importable is True, defaults to the session's
+            import directory (see TempModuleFinder.get_import_root) which is
+            only added to the syspath once
         :param make_importable: bool, if True, then tmpdir will be added to the
-            python path so it can be imported
+            python path so it can be imported, if the module is created during
+            a `testdata.TestCase` test then it is removed when the test is
+            cleaned up
         :param **kwargs:
             load: bool, set to True to import the module
             is_package: bool, True if module should be a package (directory
                 with __init__.py file instead of file.py)
-        :return: Modulepath instance
+            memory: bool, True if the module should only exist in memory,
+                this is much faster since nothing is written to disk and
+                sys.path doesn't grow, see ModuleFinder
+        :return: Modulepath instance, MemoryModulepath if memory is True
         """
         if not data:
             data = kwargs.pop(
@@ -864,7 +2116,14 @@ class PathData(TestData):
         load = kwargs.pop("load", kwargs.pop("import", False))
         ms = []
 
-        if isinstance(data, Mapping):
+        memory = kwargs.pop("memory", False)
+        if not tmpdir and make_importable and not memory:
+            tmpdir = TempModuleFinder.get_instance().get_import_root()
+
+        if memory:
+            modpath, ms = self._create_memory_module(data, modpath, **kwargs)
+
+        elif isinstance(data, Mapping):
             modpath = TempModulepath(
                 modpath,
                 dir=tmpdir,
@@ -914,6 +2173,55 @@ class PathData(TestData):
 
         return modpath
 
+    def _create_memory_module(self, data, modpath, **kwargs):
+        """Internal method that adds the module(s) to the ModuleFinder
+
+        :returns: tuple[MemoryModulepath, list[MemoryModulepath]], the
+            module and all the modules that were created
+        """
+        finder = ModuleFinder.get_instance()
+
+        if not isinstance(modpath, basestring):
+            modpath = ".".join(modpath)
+
+        if not modpath:
+            modpath = self.get_module_name(**{
+                k: kwargs[k] for k in ["count", "name", "prefix", "postfix"]
+                if k in kwargs
+            })
+
+        ms = []
+        if isinstance(data, Mapping):
+            finder.add_module(modpath, "", is_package=True)
+            ms.append(MemoryModulepath(modpath))
+
+            for mparts, mdata in TempModulepath.normpaths(data, modpath):
+                mname = ".".join(mparts)
+                finder.add_module(
+                    mname,
+                    MemoryModulepath.prepare_text(mdata or "", **kwargs),
+                )
+                ms.append(MemoryModulepath(mname))
+
+        else:
+            finder.add_module(
+                modpath,
+                MemoryModulepath.prepare_text(data, **kwargs),
+                is_package=kwargs.get("is_package", False),
+            )
+            ms.append(MemoryModulepath(modpath))
+
+        return ms[0], ms
+
+    def get_module_cache_info(self):
+        """Returns the hit and miss stats of the compiled code cache used by
+        all the created modules
+
+        :returns: dict[str, int], see ModuleFinder.cache_info
+        """
+        return ModuleFinder.get_instance().cache_info()
+    module_cache_info = get_module_cache_info
+
     def create_modules(self, module_dict, modpath="", tmpdir="", **kwargs):
         """
         create a whole bunch of modules all at once
@@ -925,8 +2233,21 @@ class PathData(TestData):
             "foo.bar" then all the keys in module_dict will be prepended with
             "foo.bar"
         :param tmpdir: str, same as create_module() tmpdir
-        :returns: Dirpath
+        :param **kwargs: passed through to create_module(), if memory=True
+            then nothing is written to disk
+        :returns: Dirpath, MemoryDirpath if memory is True
         """
+        if kwargs.get("memory", False):
+            ms = []
+            for modname, data in TempModulepath.normpaths(module_dict, modpath):
+                ms.append(self.create_module(
+                    data=data,
+                    modpath=modname,
+                    **kwargs
+                ))
+
+            return MemoryDirpath(ms)
+
         module_base_dir = self.create_dir(tmpdir=tmpdir)
         module_list = TempModulepath.normpaths(
             module_dict,
@@ -952,6 +2273,9 @@ class PathData(TestData):
         :param data: str, the contents of the module
         :param modpath: str, something like foo.bar
         :param tmpdir: str, the temp directory where the module will reside
+        :param **kwargs: passed through to create_module, pass memory=True
+            to create the module in memory, either way modules with the same
+            data reuse the same compiled code (see get_module_cache_info)
         :return: dict[str, type], the key is the class name and the value is
             the actual class object
         """
@@ -1057,6 +2381,10 @@ class PathData(TestData):
         this is primarily used by find_data(), find_data_text(), and
         find_data_bytes()
 
+        Plain basenames and file roots are looked up in a DataIndex of the
+        data directory that is built once and rebuilt when the directory
+        changes, so repeated calls don't walk the whole directory
+
         :param fileroot: string, if dirpath + fileroot is actually a full
             filepath then that will be returned, if not then dirpath/fileroot.*
             will be searched for
@@ -1076,11 +2404,23 @@ class PathData(TestData):
             if not basedir:
                 raise IOError("Could not find a testdata data directory")
 
-            patterns = [fileroot, "{}.*".format(fileroot)]
-            for pattern in patterns:
-                for f in basedir.rglob(pattern):
-                    if f:
-                        break
+            if re.search(r"[\\/*?\[]", fileroot):
+                # relative paths and patterns can't be answered by the
+                # index so fallback to searching the directory
+                patterns = [fileroot, "{}.*".format(fileroot)]
+                for pattern in patterns:
+                    for f in basedir.rglob(pattern):
+                        if f:
+                            break
+
+            else:
+                index = self._data_indexes.get(basedir.path)
+                if index is None or index.is_stale():
+                    index = DataIndex(basedir.path)
+                    self._data_indexes[basedir.path] = index
+
+                if path := index.find(fileroot):
+                    f = Filepath(path)
 
             if not f:
                 raise IOError(
@@ -1099,11 +2439,46 @@ class PathData(TestData):
 
     def find_data_text(self, fileroot, basedir="", encoding=""):
         f = self.find_data_file(fileroot, basedir, encoding)
-        return f.read_text()
+        return self._read_data_file(f, text=True)
 
     def find_data_bytes(self, fileroot, basedir=""):
         f = self.find_data_file(fileroot, basedir)
-        return f.read_bytes()
+        return self._read_data_file(f)
+
+    def _read_data_file(self, f, text=False):
+        """Internal method. Reads the contents of data file `f` using the LRU
+        content cache
+
+        Files smaller than environ.DATA_CACHE_FILE_SIZE are cached until they
+        are modified or pushed out of the cache, bigger files are read every
+        time and are never cached
+
+        :param f: Filepath, the data file
+        :param text: bool, True to return str, False to return bytes
+        :returns: str|bytes
+        """
+        st = os.stat(f)
+        if st.st_size >= environ.DATA_CACHE_FILE_SIZE:
+            return f.read_text() if text else f.read_bytes()
+
+        key = (
+            f.path,
+            st.st_mtime_ns,
+            st.st_size,
+            (f.encoding, f.errors) if text else None,
+        )
+
+        cache = self._data_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        data = f.read_text() if text else f.read_bytes()
+        cache[key] = data
+        while len(cache) > environ.DATA_CACHE_SIZE:
+            cache.popitem(last=False)
+
+        return data
 
     def find_data(self, fileroot, basedir="", encoding=""):
         """Returns the contents of a file matching basedir/fileroot.*
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import io
+import cProfile
+import pstats
+import threading
+from collections import Counter
+
+from .compat import *
+from .config import environ
+
+
+###############################################################################
+# Supporting classes and methods
+###############################################################################
+class SamplingProfiler(object):
+    """A low overhead profiler, a background thread periodically records the
+    stack of the profiled thread instead of tracing every function call like
+    cProfile does
+
+    The stacks are saved in the collapsed stack format (one line per unique
+    stack, the frames separated by semicolons followed by the sample count)
+    that flame graph tools can read
+
+    :example:
+        with SamplingProfiler() as p:
+            foo()
+        p.write("foo.collapsed")
+    """
+    def __init__(self, interval=0.001, thread_id=None):
+        """
+        :param interval: float, how many seconds between samples
+        :param thread_id: int, the thread to sample, defaults to the thread
+            that calls .start
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if not self.thread_id:
+            self.thread_id = threading.get_ident()
+
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run,
+            name="testdata-sampling-profiler",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Record the current stack of the profiled thread"""
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+
+        stack = []
+        while frame is not None:
+            stack.append(self.get_frame_name(frame))
+            frame = frame.f_back
+
+        self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def get_frame_name(self, frame):
+        """Returns the name used for frame in the collapsed stacks
+
+        :param frame: types.FrameType
+        :returns: str, eg, "Foo.bar (foo.py:10)"
+        """
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        filename = os.path.basename(code.co_filename)
+        return f"{name} ({filename}:{code.co_firstlineno})"
+
+    def top(self, count=10):
+        """Returns the functions that were running the most
+
+        :param count: int, how many functions to return
+        :returns: list[tuple[str, int]], the function name and how many
+            samples it was the innermost frame
+        """
+        leaves = Counter()
+        for stack, samples in self.stacks.items():
+            leaves[stack.rpartition(";")[2]] += samples
+        return leaves.most_common(count)
+
+    def write(self, path):
+        """Write the collapsed stacks to path"""
+        with open(path, "w") as fp:
+            for stack, samples in self.stacks.most_common():
+                fp.write(f"{stack} {samples}\n")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class Profiler(object):
+    """Profiles a test with either cProfile or the SamplingProfiler and writes
+    the results to a file named after the test
+
+    This is used by `.test.TestCase` for tests decorated with `profile_test`
+    or for all tests when environ.PROFILE is set
+    """
+    @classmethod
+    def get_mode(cls, mode):
+        """Normalize mode
+
+        :param mode: bool|str, "sample" (or "sampling") for the
+            SamplingProfiler, any other truthy value for cProfile
+        :returns: str, "sample", "cprofile", or "" if profiling is off
+        """
+        if not mode:
+            return ""
+
+        if isinstance(mode, str):
+            mode = mode.lower()
+            if mode in set(["sample", "sampling"]):
+                return "sample"
+
+            elif mode in set(["0", "false", "off", "no"]):
+                return ""
+
+        return "cprofile"
+
+    def __init__(self, mode="cprofile", **kwargs):
+        """
+        :param mode: str, see .get_mode
+        :param **kwargs:
+            * basedir: str, where the profile files are written, defaults to
+                environ.PROFILE_DIR
+            * count: int, how many functions .summary shows, defaults to
+                environ.PROFILE_COUNT
+            * interval: float, see SamplingProfiler
+        """
+        self.mode = self.get_mode(mode) or "cprofile"
+        self.basedir = kwargs.get("basedir", "") or environ.PROFILE_DIR
+        self.count = kwargs.get("count", 0) or environ.PROFILE_COUNT
+
+        if self.mode == "sample":
+            self.profiler = SamplingProfiler(
+                interval=kwargs.get("interval", 0) or environ.PROFILE_INTERVAL
+            )
+
+        else:
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if self.mode == "sample":
+            self.profiler.start()
+
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.mode == "sample":
+            self.profiler.stop()
+
+        else:
+            self.profiler.disable()
+
+    def write(self, name):
+        """Write the profile, cProfile profiles are written as pstats files
+        and sampled profiles as collapsed stack files
+
+        :param name: str, the file name without extension, usually the test
+            id
+        :returns: str, the path the profile was written to
+        """
+        os.makedirs(self.basedir, exist_ok=True)
+        if self.mode == "sample":
+            path = os.path.join(self.basedir, f"{name}.collapsed")
+            self.profiler.write(path)
+
+        else:
+            path = os.path.join(self.basedir, f"{name}.pstats")
+            self.profiler.dump_stats(path)
+
+        return path
+
+    def summary(self):
+        """Returns a summary of the functions that took the most time
+
+        :returns: str
+        """
+        if self.mode == "sample":
+            samples = self.profiler.samples or 1
+            lines = [f"{self.profiler.samples} samples"]
+            for name, count in self.profiler.top(self.count):
+                lines.append(f"{count:>8} {count / samples:>7.1%}  {name}")
+            return "\n".join(lines)
+
+        else:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(self.count)
+            return stream.getvalue().strip()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def profile_test(mode="cprofile", count=0):
+    """Decorator that profiles the test method every time it runs
+
+    :example:
+        class FooTest(TestCase):
+            @profile_test()
+            def test_foo(self):
+                pass
+
+            @profile_test("sample")
+            def test_bar(self):
+                pass
+
+    :param mode: str, see Profiler.get_mode
+    :param count: int, how many functions to show in the summary, defaults
+        to environ.PROFILE_COUNT
+    """
+    def decorator(func):
+        func._testdata_profile = {"mode": mode, "count": count}
+        return func
+
+    if callable(mode):
+        # called without parens: @profile_test
+        func, mode = mode, "cprofile"
+        return decorator(func)
+
+    return decorator
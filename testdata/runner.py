@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""Run unittest tests in parallel
+
+    $ python -m testdata.runner -j 4 tests
+
+Test classes are spread across a pool of worker processes, each worker gets
+its own temp directory (TESTDATA_TEMPDIR) and unique value space, and every
+test's random module is seeded from the run's seed and the test's id, so a
+failing test can be re-ran with the same random data by passing in the seed
+the run printed
+
+The workers import the tests by name using the main process's sys.path, so
+modules created with testdata (eg, `testdata.create_module`) in the main
+process can be ran as long as they were written to disk, but in-memory
+modules (memory=True) only exist in the main process
+"""
+import os
+import sys
+import random
+import tempfile
+import argparse
+import unittest
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .compat import *
+from .config import environ
+from .test import _TestCaseMixin
+from .types.number import NumberData
+
+
+###############################################################################
+# Supporting classes and methods
+###############################################################################
+class WorkerResult(unittest.TestResult):
+    """The result used in the worker processes, it saves each outcome in a
+    form that can be sent back to the main process
+
+    Each test's random module is seeded right before the test starts so the
+    random data a test gets doesn't depend on what other tests ran before it
+    in the same worker, see also run_tests
+    """
+    def __init__(self, seed, **kwargs):
+        super().__init__(**kwargs)
+        self.seed = seed
+        self.records = []
+
+    def startTest(self, test):
+        random.seed(f"{self.seed}:{test.id()}")
+        super().startTest(test)
+
+    def add_record(self, test, status, detail=""):
+        self.records.append({
+            "id": test.id(),
+            "name": str(test),
+            "description": test.shortDescription(),
+            "status": status,
+            "detail": detail,
+        })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self.add_record(test, "success")
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self.add_record(test, "error", self.errors[-1][1])
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.add_record(test, "failure", self.failures[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.add_record(test, "skip", reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        detail = self.expectedFailures[-1][1]
+        self.add_record(test, "expected_failure", detail)
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.add_record(test, "unexpected_success")
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            if issubclass(err[0], test.failureException):
+                self.add_record(subtest, "failure", self.failures[-1][1])
+
+            else:
+                self.add_record(subtest, "error", self.errors[-1][1])
+
+
+class RemoteTest(object):
+    """Stands in for a test that ran in a worker process so the main
+    process's result can report it like any other test"""
+    def __init__(self, record):
+        self.record = record
+
+    def id(self):
+        return self.record["id"]
+
+    def shortDescription(self):
+        return self.record["description"]
+
+    def __str__(self):
+        return self.record["name"]
+
+
+class ParallelResult(unittest.TextTestResult):
+    """The main process's result, the outcomes of the tests that ran in the
+    workers are merged into it with .add_record"""
+    def add_record(self, record):
+        test = RemoteTest(record)
+        status = record["status"]
+        detail = record["detail"]
+
+        self.startTest(test)
+
+        if status == "success":
+            self.addSuccess(test)
+
+        elif status == "skip":
+            self.addSkip(test, detail)
+
+        elif status == "unexpected_success":
+            self.addUnexpectedSuccess(test)
+
+        else:
+            # these already have a formatted traceback instead of the
+            # exception info the add* methods expect
+            if status == "failure":
+                self.failures.append((test, detail))
+                self.write_status("FAIL", "F")
+
+            elif status == "error":
+                self.errors.append((test, detail))
+                self.write_status("ERROR", "E")
+
+            elif status == "expected_failure":
+                self.expectedFailures.append((test, detail))
+                self.write_status("expected failure", "x")
+
+        self.stopTest(test)
+
+    def write_status(self, long_status, short_status):
+        if self.showAll:
+            self.stream.writeln(long_status)
+
+        elif self.dots:
+            self.stream.write(short_status)
+
+        self.stream.flush()
+
+
+class ParallelSuite(object):
+    """Runs test classes across a process pool
+
+    This is passed to `unittest.TextTestRunner.run` like any other suite so
+    the merged results are reported exactly like a normal unittest run
+    """
+    def __init__(self, tests, jobs=0, seed=None, buffer=False, context=None):
+        """
+        :param tests: unittest.TestSuite, usually from a TestLoader
+        :param jobs: int, how many worker processes, defaults to the cpu
+            count
+        :param seed: str, the random seed for the whole run, every test is
+            seeded with this and its test id
+        :param buffer: bool, buffer stdout and stderr while the tests run
+        :param context: str, the multiprocessing start method (eg, "spawn"),
+            defaults to the platform's default
+        """
+        self.jobs = jobs or os.cpu_count() or 1
+        self.seed = random.randrange(sys.maxsize) if seed is None else seed
+        self.buffer = buffer
+        self.context = context
+        self.units, self.local = self.get_units(tests)
+
+    def get_units(self, tests):
+        """Group the tests by class since a class is the smallest unit that
+        can be ran on its own (setUpClass, tearDownClass)
+
+        :param tests: unittest.TestSuite
+        :returns: tuple[list[list[str]], unittest.TestSuite], the test ids
+            of each class, biggest classes first, and the tests that can't
+            be found by name (eg, modules that failed to import) and so have
+            to run in the main process
+        """
+        classes = {}
+        local = unittest.TestSuite()
+        for test in self.iter_tests(tests):
+            if type(test).__module__.startswith("unittest."):
+                local.addTest(test)
+
+            else:
+                klass = type(test)
+                classpath = f"{klass.__module__}.{klass.__qualname__}"
+                classes.setdefault(classpath, []).append(test.id())
+
+        units = sorted(classes.values(), key=len, reverse=True)
+        return units, local
+
+    def iter_tests(self, tests):
+        for test in tests:
+            if isinstance(test, unittest.TestSuite):
+                yield from self.iter_tests(test)
+
+            else:
+                yield test
+
+    def countTestCases(self):
+        return sum(len(unit) for unit in self.units) + len(self.local._tests)
+
+    def __call__(self, result):
+        return self.run(result)
+
+    def run(self, result):
+        """Run all the tests and merge their outcomes into result
+
+        :param result: ParallelResult
+        :returns: ParallelResult
+        """
+        if self.local.countTestCases():
+            self.local(result)
+
+        ctx = multiprocessing.get_context(self.context)
+        indexes = ctx.Queue()
+        for index in range(self.jobs):
+            indexes.put(index)
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=ctx,
+            initializer=init_worker,
+            initargs=(indexes, list(sys.path)),
+        )
+        with executor:
+            futures = [
+                executor.submit(run_tests, unit, self.seed, self.buffer)
+                for unit in self.units
+            ]
+
+            for future in as_completed(futures):
+                records, timings = future.result()
+                for record in records:
+                    result.add_record(record)
+
+                for test_id, phases in timings.items():
+                    _TestCaseMixin.timings.record(test_id, phases)
+
+                if result.shouldStop:
+                    for f in futures:
+                        f.cancel()
+                    break
+
+        return result
+
+
+def init_worker(indexes, paths):
+    """Set up a worker process, this is the process pool initializer
+
+    Each worker gets an index (also available as environ.WORKER), its own
+    temp directory, and a unique value space that doesn't share anything with
+    the main process
+
+    :param indexes: multiprocessing.Queue, the worker indexes
+    :param paths: list[str], the main process's sys.path so the workers can
+        import the same test modules, this includes the directories of the
+        modules testdata created, so they can be imported even when the
+        workers aren't forked from the main process
+    """
+    index = indexes.get()
+
+    for path in reversed(paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    basedir = tempfile.mkdtemp(prefix=f"testdata-worker{index}-")
+    tempfile.tempdir = basedir
+    os.environ[environ.key("TEMPDIR")] = basedir
+    os.environ[environ.key("WORKER")] = str(index)
+
+    # the main process writes the timings report after it merges the
+    # workers' timings
+    os.environ[environ.key("TIMINGS_PATH")] = ""
+
+    NumberData._previous_ints.clear()
+    NumberData._previous_floats.clear()
+    _TestCaseMixin.timings.clear()
+
+
+def run_tests(test_ids, seed, buffer=False):
+    """Run the tests in a worker process
+
+    :param test_ids: list[str], the tests to load and run
+    :param seed: str, see ParallelSuite
+    :param buffer: bool, see ParallelSuite
+    :returns: tuple[list[dict], dict], the outcome of each test and the
+        timings of each test
+    """
+    result = WorkerResult(seed)
+    result.buffer = buffer
+
+    _TestCaseMixin.timings.clear()
+    suite = unittest.defaultTestLoader.loadTestsFromNames(test_ids)
+
+    # the tests are all from the same class, this seeds the class's fixtures
+    # (eg, setUpClass), each test is seeded again by WorkerResult.startTest
+    random.seed(f"{seed}:{test_ids[0].rpartition('.')[0]}")
+    suite(result)
+    return result.records, _TestCaseMixin.timings.tests
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m testdata.runner",
+        description="Run unittest tests in parallel",
+    )
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=(
+            "Modules, classes, methods, or directories to run, defaults to"
+            " discovering tests in the current directory"
+        ),
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=0,
+        help="How many worker processes, defaults to the cpu count",
+    )
+    parser.add_argument(
+        "-p", "--pattern",
+        default="*test*.py",
+        help="Pattern to match test files when discovering tests",
+    )
+    parser.add_argument(
+        "-t", "--top-level-directory",
+        default=None,
+        help="Top level directory of the project when discovering tests",
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        help="The random seed, defaults to a random seed that is printed",
+    )
+    parser.add_argument(
+        "-b", "--buffer",
+        action="store_true",
+        help="Buffer stdout and stderr during tests",
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        dest="verbosity",
+        action="store_const",
+        const=2,
+        default=1,
+        help="Verbose output",
+    )
+    parser.add_argument(
+        "-q", "--quiet",
+        dest="verbosity",
+        action="store_const",
+        const=0,
+        help="Quiet output",
+    )
+    return parser
+
+
+def get_tests(names, pattern="*test*.py", top_level_dir=None):
+    """Load the tests like unittest would
+
+    :param names: list[str], module, class, or method names or directories
+        to discover
+    :param pattern: str, the discovery file pattern
+    :param top_level_dir: str, see unittest.TestLoader.discover, defaults
+        to the current directory so test packages can use relative imports
+    :returns: unittest.TestSuite
+    """
+    loader = unittest.defaultTestLoader
+    suite = unittest.TestSuite()
+    for name in names or ["."]:
+        if os.path.isdir(name):
+            suite.addTest(
+                loader.discover(name, pattern, top_level_dir or os.getcwd())
+            )
+
+        else:
+            suite.addTest(loader.loadTestsFromName(name))
+
+    return suite
+
+
+def main(argv=None):
+    """Run the tests
+
+    :param argv: list[str], the command line arguments
+    :returns: int, the exit code
+    """
+    args = get_parser().parse_args(argv)
+
+    if "" not in sys.path and os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    tests = get_tests(args.names, args.pattern, args.top_level_directory)
+    suite = ParallelSuite(
+        tests,
+        jobs=args.jobs,
+        seed=args.seed,
+        buffer=args.buffer,
+    )
+
+    stream = sys.stderr
+    if args.verbosity:
+        stream.write(
+            f"Running {suite.countTestCases()} tests with {suite.jobs}"
+            f" workers, seed {suite.seed}\n"
+        )
+
+    runner = unittest.TextTestRunner(
+        stream=stream,
+        verbosity=args.verbosity,
+        resultclass=ParallelResult,
+    )
+    result = runner.run(suite)
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
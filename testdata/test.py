@@ -12,10 +12,26 @@ from contextlib import contextmanager
 import time
 import importlib
 import inspect
+import os
+import math
+import json
+import statistics
+import tracemalloc
+import gc
+import atexit
+
+try:
+    import resource
+
+except ImportError:
+    # resource is only available on unix systems
+    resource = None
 
 from .compat import *
 from .config import environ
 from .base import TestData
+from .profiling import Profiler, profile_test
+from .case import _TestCaseCallMixin
 
 
 # https://docs.python.org/3/library/unittest.html#unittest.skip
@@ -34,6 +50,174 @@ expect_failure = expectedFailure
 #     pass
 
 
+class Benchmark(object):
+    """Times a callable many times so the timings can be trusted more than a
+    single run's timing
+
+    This is used by `_TestCaseMixin.assertBenchmark`
+    """
+    def __init__(
+        self,
+        callback,
+        rounds=0,
+        warmup=3,
+        min_time=0.2,
+        max_rounds=100000,
+    ):
+        """
+        :param callback: callable, this is called with no arguments
+        :param rounds: int, how many timed calls, if 0 then the rounds are
+            calibrated so all the rounds take about min_time seconds
+        :param warmup: int, how many calls to make and throw away before any
+            calls are timed, this gives caches a chance to fill up
+        :param min_time: float, see rounds
+        :param max_rounds: int, the most rounds calibration will pick
+        """
+        self.callback = callback
+        self.rounds = rounds
+        self.warmup = warmup
+        self.min_time = min_time
+        self.max_rounds = max_rounds
+        self.timings = []
+
+    def calibrate(self):
+        """Returns how many rounds should be ran"""
+        start = time.perf_counter_ns()
+        self.callback()
+        elapsed = max(time.perf_counter_ns() - start, 1)
+        rounds = int(self.min_time * 1_000_000_000 / elapsed)
+        return max(5, min(rounds, self.max_rounds))
+
+    def run(self):
+        """Time the callback
+
+        :returns: dict[str, float|int], see .get_stats
+        """
+        for _ in range(self.warmup):
+            self.callback()
+
+        rounds = self.rounds or self.calibrate()
+        perf_counter_ns = time.perf_counter_ns
+        callback = self.callback
+        timings = []
+        for _ in range(rounds):
+            start = perf_counter_ns()
+            callback()
+            timings.append(perf_counter_ns() - start)
+
+        self.timings = timings
+        return self.get_stats()
+
+    def get_stats(self):
+        """Returns the statistics of the timings, all the times are seconds
+
+        :returns: dict[str, float|int], with keys rounds, min, max, mean,
+            median, p95, p99, and stddev
+        """
+        timings = sorted(t / 1_000_000_000 for t in self.timings)
+        count = len(timings)
+
+        def percentile(p):
+            # nearest rank
+            return timings[max(0, math.ceil(p / 100 * count) - 1)]
+
+        return {
+            "rounds": count,
+            "min": timings[0],
+            "max": timings[-1],
+            "mean": statistics.fmean(timings),
+            "median": statistics.median(timings),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "stddev": statistics.stdev(timings) if count > 1 else 0.0,
+        }
+
+
+class Timings(object):
+    """Collects how long each part of every test took
+
+    Every `TestCase` adds its timings here when its cleanups finish, the
+    parts (phases) are:
+
+        * data_setups - the `TestData.get_setups` hooks
+        * setUp - setUp (and asyncSetUp)
+        * test - the test method
+        * tearDown - tearDown (and asyncTearDown)
+        * data_cleanups - the `TestData.get_cleanups` hooks
+        * cleanups - everything passed to addCleanup
+
+    :example:
+        # the 10 slowest tests so far
+        for timing in TestCase.timings.slowest(10):
+            print(timing["id"], timing["total"])
+    """
+    phases = [
+        "data_setups",
+        "setUp",
+        "test",
+        "tearDown",
+        "data_cleanups",
+        "cleanups",
+    ]
+
+    def __init__(self):
+        self.tests = {}
+
+    def record(self, test_id, timings):
+        """Save the timings for the test
+
+        :param test_id: str, usually the value of `TestCase.id()`
+        :param timings: dict[str, int], phase name to nanoseconds
+        """
+        self.tests[test_id] = dict(timings)
+
+    def slowest(self, count=10):
+        """Returns the slowest tests
+
+        :param count: int, how many tests to return, 0 for all of them
+        :returns: list[dict], each dict has the test id, the total seconds,
+            and the seconds of each phase, sorted slowest first
+        """
+        timings = []
+        for test_id, phases in self.tests.items():
+            timing = {"id": test_id, "total": sum(phases.values()) / 1e9}
+            for phase in self.phases:
+                timing[phase] = phases.get(phase, 0) / 1e9
+            timings.append(timing)
+
+        timings.sort(key=lambda timing: timing["total"], reverse=True)
+        return timings[:count] if count else timings
+
+    def to_json(self, path="", count=10):
+        """Returns the slowest tests as json and writes them to path
+
+        :param path: str, if passed in the report is written to this file
+        :param count: int, see .slowest
+        :returns: str, the json report
+        """
+        total = sum(sum(phases.values()) for phases in self.tests.values())
+        report = json.dumps(
+            {
+                "count": len(self.tests),
+                "total": total / 1e9,
+                "slowest": self.slowest(count),
+            },
+            indent=2,
+        )
+
+        if path:
+            with open(path, "w") as fp:
+                fp.write(report)
+
+        return report
+
+    def clear(self):
+        self.tests = {}
+
+    def __len__(self):
+        return len(self.tests)
+
+
 class _TestDataMixin(object):
     """The mixin for both the TestCase and the TestCase metaclass that provides
     the passthrough to the testdata functions if the called method doesn't exist
@@ -56,7 +240,40 @@ class _TestDataMixin(object):
             return super().__getattr__(name)
 
         else:
-            return self.data.__findattr__(name)
+            # found methods are cached on the class (each TestCase class has
+            # its own cache) until a TestData class is added or removed
+            klass = self if isinstance(self, type) else type(self)
+            version = self.data._data_instances.version
+            cache = klass.__dict__.get("_data_attrs", None)
+            if cache is None or cache[0] != version:
+                cache = (version, {})
+                setattr(klass, "_data_attrs", cache)
+
+            attr = cache[1].get(name, None)
+            if attr is not None:
+                # the method could've been patched (eg, with
+                # `testdata.patching`) since it was cached
+                instance = attr.__self__
+                if (
+                    getattr(type(instance), name, None) is attr.__func__
+                    and name not in instance.__dict__
+                ):
+                    return attr
+
+            attr = self.data.__findattr__(name)
+            # only methods are cached because other attributes can be
+            # set and changed on the TestData classes
+            if (
+                inspect.ismethod(attr)
+                and isinstance(attr.__self__, TestData)
+                and version == self.data._data_instances.version
+            ):
+                cache[1][name] = attr
+
+            else:
+                cache[1].pop(name, None)
+
+            return attr
 
 
 class _TestCaseMeta(_TestDataMixin, type):
@@ -65,13 +282,67 @@ class _TestCaseMeta(_TestDataMixin, type):
     pass
 
 
-class _TestCaseMixin(object):
+class _TestCaseMixin(_TestCaseCallMixin):
     """
     From the docs:
         A new TestCase instance is created as a unique test fixture used to
         execute each individual test method. Thus setUp(), tearDown(), and
         __init__() will be called once per test
     """
+    timings = Timings()
+    """Every test's timings, see Timings"""
+
+    def _addTiming(self, phase, start):
+        """Internal method. Adds the nanoseconds since start to phase
+
+        :param phase: str, see Timings.phases
+        :param start: int, a `time.perf_counter_ns` value
+        """
+        elapsed = time.perf_counter_ns() - start
+        if "_timings_ns" not in self.__dict__:
+            self._timings_ns = {}
+        self._timings_ns[phase] = self._timings_ns.get(phase, 0) + elapsed
+
+    def _getProfiler(self, method):
+        """Internal method. Returns a profiler if method was decorated with
+        `profile_test` or environ.PROFILE is set
+
+        :param method: callable, the test method
+        :returns: Profiler|None
+        """
+        options = getattr(method, "_testdata_profile", None)
+        if options:
+            return Profiler(options["mode"], count=options["count"])
+
+        elif Profiler.get_mode(environ.PROFILE):
+            return Profiler(environ.PROFILE)
+
+    def _addDataCleanup(self, function, *args, **kwargs):
+        """Internal method. Adds a `TestData.get_cleanups` hook so its time
+        is counted separately from the test's own cleanups"""
+        if "_data_cleanups" not in self.__dict__:
+            self._data_cleanups = []
+        self._data_cleanups.append(function)
+        self.addCleanup(function, *args, **kwargs)
+
+    def _recordTimings(self):
+        """Internal method. Called after the cleanups have ran to add this
+        test's timings to .timings"""
+        self.timings.record(self.id(), self.__dict__.get("_timings_ns", {}))
+
+    @staticmethod
+    def profile_test(mode="cprofile", count=0):
+        """Profile test decorator
+
+        :example:
+            @TestCase.profile_test("sample")
+            def test_foo(self):
+                pass
+
+        see `.profiling.profile_test`
+        """
+        return profile_test(mode, count)
+
     @staticmethod
     def skip(reason=""):
         """Skip test decorator
@@ -198,7 +469,99 @@ class _TestCaseMixin(object):
 
         see testdata.TestdataData.wait()
         """
-        self.data.wait(callback, cb_args, cb_kwargs, timeout, interval)
+        self.data.__findattr__("wait")(
+            callback,
+            cb_args,
+            cb_kwargs,
+            timeout,
+            interval
+        )
+
+    def assertBenchmark(
+        self,
+        callback,
+        max_median=None,
+        max_p99=None,
+        rounds=0,
+        warmup=3,
+        **kwargs
+    ):
+        """Time callback many times and fail if it was too slow
+
+        :Example:
+            # fail if the median call takes longer than 1ms
+            stats = self.assertBenchmark(foo, max_median=0.001)
+            print(stats["p99"])
+
+        :param callback: callable, this is called with no arguments
+        :param max_median: float, the most seconds the median call can take
+        :param max_p99: float, the most seconds the 99th percentile call can
+            take
+        :param rounds: int, how many calls to time, see Benchmark
+        :param warmup: int, how many calls to throw away, see Benchmark
+        :param **kwargs:
+            * max_mean: float, the most seconds the mean call can take
+            * max_p95: float, the most seconds the 95th percentile call can
+                take
+            * min_time: float, see Benchmark
+            * baseline: str, path to a json file of previous stats, the
+                median and p99 can't be more than tolerance slower than the
+                baseline's values, if the file doesn't have stats for this
+                benchmark then they are saved, they are also saved if
+                environ.BENCHMARK_SAVE is True
+            * tolerance: float, how much slower than the baseline is allowed,
+                defaults to 0.1 (10%)
+            * name: str, the baseline key, defaults to the test's id
+        :returns: dict[str, float|int], see Benchmark.get_stats
+        """
+        benchmark = Benchmark(
+            callback,
+            rounds=rounds,
+            warmup=warmup,
+            min_time=kwargs.get("min_time", 0.2),
+        )
+        stats = benchmark.run()
+
+        report = ", ".join(
+            f"{k}={v}" if k == "rounds" else f"{k}={v:.9f}"
+            for k, v in stats.items()
+        )
+
+        maxes = {
+            "median": max_median,
+            "p99": max_p99,
+            "mean": kwargs.get("max_mean", None),
+            "p95": kwargs.get("max_p95", None),
+        }
+        for k, v in maxes.items():
+            if v is not None and stats[k] > v:
+                self.fail(f"Benchmark {k} {stats[k]:.9f} > {v} ({report})")
+
+        if baseline := kwargs.get("baseline", ""):
+            name = kwargs.get("name", "") or self.id()
+            tolerance = kwargs.get("tolerance", 0.1)
+
+            baselines = {}
+            if os.path.isfile(baseline):
+                with open(baseline) as fp:
+                    baselines = json.load(fp)
+
+            if name in baselines and not environ.BENCHMARK_SAVE:
+                for k in ["median", "p99"]:
+                    v = baselines[name].get(k, None)
+                    if v is not None and stats[k] > v * (1.0 + tolerance):
+                        self.fail(
+                            f"Benchmark {k} {stats[k]:.9f} is more than"
+                            f" {tolerance:.0%} slower than baseline {v:.9f}"
+                            f" ({report})"
+                        )
+
+            else:
+                baselines[name] = stats
+                with open(baseline, "w") as fp:
+                    json.dump(baselines, fp, indent=2, sort_keys=True)
+
+        return stats
 
     def assertAscii(self, s):
         """checks if the entire string only contains ASCII characters
@@ -253,6 +616,228 @@ class _TestCaseMixin(object):
                         seconds[0]
                     ))
 
+    def _get_rusage(self, thread=False):
+        """Internal method. Returns the context switch and page fault counts
+        for the process (or just the current thread)
+
+        :param thread: bool, True to only count the current thread, this
+            falls back to the whole process if the os can't count threads
+        :returns: dict[str, int]|None, None if resource usage isn't
+            available
+        """
+        if resource is None:
+            return None
+
+        who = resource.RUSAGE_SELF
+        if thread:
+            who = getattr(resource, "RUSAGE_THREAD", who)
+
+        usage = resource.getrusage(who)
+        return {
+            "context_switches": usage.ru_nvcsw + usage.ru_nivcsw,
+            "page_faults": usage.ru_minflt + usage.ru_majflt,
+        }
+
+    @contextmanager
+    def assertCPUWithin(self, *seconds, thread=False, **kwargs):
+        """checks the code used at most seconds of cpu time, unlike
+        .assertWithin this doesn't count time spent waiting on other
+        processes or sleeping, so it isn't thrown off by a busy machine
+
+        :Example:
+            with self.assertCPUWithin(0.5) as stats:
+                foo() # fails if foo used more than .5 cpu seconds
+            print(stats["cpu"], stats["context_switches"])
+
+            with self.assertCPUWithin(1, max_context_switches=10):
+                foo()
+
+        :param *seconds: float(s), see .assertWithin
+        :param thread: bool, True to only count the cpu time of the current
+            thread (time.thread_time), otherwise the whole process is
+            counted (time.process_time)
+        :param **kwargs:
+            * max_context_switches: int, the most voluntary and involuntary
+                context switches allowed
+            * max_page_faults: int, the most minor and major page faults
+                allowed
+            the counters use resource.getrusage and are ignored on systems
+            that don't have it
+        :returns: dict, yielded and then filled in when the with statement
+            exits with the cpu seconds and, if available, the
+            context_switches and page_faults counts
+        """
+        clock = time.thread_time if thread else time.process_time
+        stats = {}
+
+        usage = self._get_rusage(thread)
+        start = clock()
+
+        yield stats
+
+        stats["cpu"] = clock() - start
+        if usage is not None:
+            for k, v in self._get_rusage(thread).items():
+                stats[k] = v - usage[k]
+
+        total = stats["cpu"]
+        if len(seconds) > 1:
+            if total <= seconds[0] or total >= seconds[1]:
+                self.fail(
+                    "CPU time {:.2f} seconds was not within {} - {}"
+                    " seconds".format(total, seconds[0], seconds[1])
+                )
+
+        elif seconds and total > seconds[0]:
+            self.fail("CPU time {:.2f} seconds > {} seconds".format(
+                total,
+                seconds[0]
+            ))
+
+        for k in ["context_switches", "page_faults"]:
+            v = kwargs.get(f"max_{k}", None)
+            if v is not None and k in stats and stats[k] > v:
+                self.fail(f"{stats[k]} {k.replace('_', ' ')} > {v}")
+
+    def assertThreadCPUWithin(self, *seconds, **kwargs):
+        """Same as .assertCPUWithin but only counts the current thread"""
+        kwargs["thread"] = True
+        return self.assertCPUWithin(*seconds, **kwargs)
+
+    def _get_allocation_report(self, before, after, top=10):
+        """Internal method. Returns a top allocations diff between two
+        tracemalloc snapshots, grouped by file and line
+
+        :param before: tracemalloc.Snapshot
+        :param after: tracemalloc.Snapshot
+        :param top: int, how many file lines to include
+        :returns: str
+        """
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        before = before.filter_traces(filters)
+        after = after.filter_traces(filters)
+
+        lines = [f"Top {top} allocations by file and line:"]
+        for stat in after.compare_to(before, "lineno")[:top]:
+            lines.append(f"    {stat}")
+        return "\n".join(lines)
+
+    @contextmanager
+    def assertMaxMemory(self, max_bytes, top=10):
+        """checks the code inside the with statement never has more than
+        max_bytes of new memory allocated at once
+
+        :Example:
+            with self.assertMaxMemory(1024 * 1024):
+                foo() # fails if foo used more than 1MB at its peak
+
+        :param max_bytes: int, the most the peak allocated memory can grow
+        :param top: int, on failure, how many of the biggest allocations to
+            include in the error message
+        """
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+
+        try:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            before = tracemalloc.take_snapshot()
+
+            yield self
+
+            _, peak = tracemalloc.get_traced_memory()
+            used = peak - current
+            if used > max_bytes:
+                report = self._get_allocation_report(
+                    before,
+                    tracemalloc.take_snapshot(),
+                    top=top
+                )
+                self.fail(
+                    f"Peak memory {used} bytes > {max_bytes} bytes\n{report}"
+                )
+
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    def assertNoLeak(self, callback, iterations=100, max_bytes=None, **kwargs):
+        """checks that calling callback over and over doesn't keep growing
+        the allocated memory
+
+        :Example:
+            cache = []
+            def foo():
+                cache.append(testdata.get_words())
+            self.assertNoLeak(foo) # fails because cache keeps growing
+
+        :param callback: callable, this is called with no arguments
+        :param iterations: int, how many times to call callback after it has
+            been warmed up
+        :param max_bytes: int, how much memory is allowed to still be
+            allocated after all the iterations, defaults to one byte per
+            iteration, anything that leaks a whole object each call will be
+            bigger than this
+        :param **kwargs:
+            * warmup: int, how many times to call callback before the first
+                snapshot, so things like lazy imports and caches get a
+                chance to fill up, defaults to 3
+            * top: int, see .assertMaxMemory
+        :returns: int, how many bytes the memory grew
+        """
+        if max_bytes is None:
+            max_bytes = iterations
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+
+        try:
+            for _ in range(kwargs.get("warmup", 3)):
+                callback()
+
+            gc.collect()
+            before = tracemalloc.take_snapshot()
+
+            for _ in range(iterations):
+                callback()
+
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+
+            report = self._get_allocation_report(
+                before,
+                after,
+                top=kwargs.get("top", 10)
+            )
+
+            # the snapshots themselves aren't in the traces, but this
+            # method's frames are, so only count what the callback kept
+            filters = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+            growth = sum(
+                stat.size_diff for stat in after.filter_traces(
+                    filters
+                ).compare_to(before.filter_traces(filters), "filename")
+            )
+            if growth > max_bytes:
+                self.fail(
+                    f"Memory grew {growth} bytes > {max_bytes} bytes"
+                    f" after {iterations} iterations\n{report}"
+                )
+
+            return growth
+
+        finally:
+            if started:
+                tracemalloc.stop()
+
 
 class TestCase(
     _TestDataMixin,
@@ -296,19 +881,28 @@ class TestCase(
 
     def _callSetUp(self):
         """Wrapper that hooks into `TestData.get_*_setups` functionality"""
-        for data_classes, node in self.data._data_instances.leaves():
-            for t in node.value.get_setups():
+        start = time.perf_counter_ns()
+        for hook in self.data._data_instances.get_hooks("get_setups"):
+            for t in hook():
                 t[0](*t[1], **t[2])
+        self._addTiming("data_setups", start)
 
-        super()._callSetUp()
+        start = time.perf_counter_ns()
+        try:
+            super()._callSetUp()
+
+        finally:
+            self._addTiming("setUp", start)
 
     def doCleanups(self):
         """Wrapper that hooks into `TestData.get_*_cleanups` functionality"""
-        for data_classes, node in self.data._data_instances.leaves():
-            for t in reversed([*node.value.get_cleanups()]):
-                self.addCleanup(t[0], *t[1], **t[2])
+        for hook in self.data._data_instances.get_hooks("get_cleanups"):
+            for t in reversed([*hook()]):
+                self._addDataCleanup(t[0], *t[1], **t[2])
 
-        return super().doCleanups()
+        ret = super().doCleanups()
+        self._recordTimings()
+        return ret
 
 
 class IsolatedAsyncioTestCase(
@@ -344,19 +938,45 @@ class IsolatedAsyncioTestCase(
     def _callSetUp(self):
         """Wrapper that hooks into `TestData.get_*_setups` functionality"""
         self._asyncioRunner.get_loop()
-        for data_classes, node in self.data._data_instances.leaves():
-            it = (*node.value.get_setups(), *node.value.get_async_setups())
-            for t in it:
+        start = time.perf_counter_ns()
+        hooks = self.data._data_instances.get_hooks(
+            "get_setups",
+            "get_async_setups",
+        )
+        for hook in hooks:
+            for t in hook():
                 self._callMaybeAsync(t[0], *t[1], **t[2])
+        self._addTiming("data_setups", start)
 
-        return super()._callSetUp()
+        start = time.perf_counter_ns()
+        try:
+            return super()._callSetUp()
+
+        finally:
+            self._addTiming("setUp", start)
 
     def doCleanups(self):
         """Wrapper that hooks into `TestData.get_*_cleanups` functionality"""
-        for data_classes, node in self.data._data_instances.leaves():
-            it = (*node.value.get_async_cleanups(), *node.value.get_cleanups())
-            for t in reversed(it):
-                self.addCleanup(t[0], *t[1], **t[2])
-
-        return super().doCleanups()
-
+        # cleanups run LIFO so each instance's cleanups are added before its
+        # async cleanups, that way the async cleanups run first
+        hooks = self.data._data_instances.get_hooks(
+            "get_cleanups",
+            "get_async_cleanups",
+        )
+        for hook in hooks:
+            for t in reversed([*hook()]):
+                self._addDataCleanup(t[0], *t[1], **t[2])
+
+        ret = super().doCleanups()
+        self._recordTimings()
+        return ret
+
+
+@atexit.register
+def _write_timings():
+    """Writes the slowest tests report if environ.TIMINGS_PATH is set"""
+    if environ.TIMINGS_PATH and _TestCaseMixin.timings:
+        _TestCaseMixin.timings.to_json(
+            environ.TIMINGS_PATH,
+            environ.TIMINGS_COUNT,
+        )
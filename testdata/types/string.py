@@ -16,6 +16,7 @@ import string
 import sys
 import uuid
 import hashlib
+import zlib
 
 from datatypes import Url, ByteString
 
@@ -34,6 +35,11 @@ from ..data.countries import country_tlds
 # testdata functions
 ###############################################################################
 class StringData(TestData):
+
+    # caches the calibrated random fraction for get_compressible_chunks so
+    # the calibration against zlib only has to happen once per ratio
+    _compressible_fractions = {}
+
     def get_domain(
         self,
         subdomain: str = "",
@@ -260,6 +266,80 @@ class StringData(TestData):
         """
         return self.get_str(str_size=1, **kwargs)
 
+    def get_compressible_chunks(self, size, ratio=0.3, chunk_size=65536):
+        """Yield bytes chunks adding up to `size` bytes that zlib will
+        compress to roughly `ratio` of their original size
+
+        Each chunk is made of blocks that are part random bytes (which are
+        incompressible) and part repeated bytes (which are almost completely
+        compressible), the random fraction of each block is calibrated
+        against `zlib` the first time a ratio is requested
+
+        :param size: int, the total bytes that will be yielded
+        :param ratio: float, between 0.0 and 1.0, the compressed size divided
+            by the uncompressed size, so 0.3 means the data should compress
+            to about 30% of its size
+        :param chunk_size: int, the max size of each chunk
+        :returns: generator[bytes]
+        """
+        fraction = self._get_compressible_fraction(ratio, chunk_size)
+        remaining = size
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            yield self._get_compressible_chunk(n, fraction)
+            remaining -= n
+
+    def get_compressible_bytes(self, size, ratio=0.3, chunk_size=65536):
+        """Get `size` bytes that zlib will compress to roughly `ratio` of
+        their original size
+
+        see .get_compressible_chunks
+
+        :returns: bytes
+        """
+        return b"".join(self.get_compressible_chunks(size, ratio, chunk_size))
+    get_compressible = get_compressible_bytes
+
+    def _get_compressible_chunk(self, size, fraction, block_size=1024):
+        """Internal method. Returns `size` bytes where `fraction` of every
+        `block_size` block is random and the rest is null bytes"""
+        block_size = min(block_size, size)
+        random_size = int(block_size * fraction)
+        repeat = b"\x00" * (block_size - random_size)
+
+        block_count, leftover = divmod(size, block_size)
+        rand = random.randbytes(random_size * block_count)
+
+        blocks = []
+        for i in range(block_count):
+            blocks.append(rand[i * random_size:(i + 1) * random_size])
+            blocks.append(repeat)
+
+        if leftover:
+            blocks.append(random.randbytes(int(leftover * fraction)))
+            blocks.append(b"\x00" * (leftover - int(leftover * fraction)))
+
+        return b"".join(blocks)
+
+    def _get_compressible_fraction(self, ratio, chunk_size, tolerance=0.005):
+        """Internal method. Find the random fraction that makes a chunk
+        compress to `ratio` when compressed with zlib"""
+        ratio = min(max(ratio, 0.0), 1.0)
+        key = (round(ratio, 4), chunk_size)
+        if key not in self._compressible_fractions:
+            fraction = ratio
+            for _ in range(8):
+                sample = self._get_compressible_chunk(chunk_size, fraction)
+                actual = len(zlib.compress(sample)) / len(sample)
+                if abs(actual - ratio) <= tolerance or not actual:
+                    break
+
+                fraction = min(max(fraction * ratio / actual, 0.0), 1.0)
+
+            self._compressible_fractions[key] = fraction
+
+        return self._compressible_fractions[key]
+
     def get_hash(self, str_size=32, **kwargs):
         """Returns a random hash, if you want an md5 use get_md5(), if you want
         an uuid use get_uuid()"""
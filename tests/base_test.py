@@ -81,3 +81,34 @@ class TestDatasTest(TestCase):
 
         self.data.delete_class(modpath.get_module().MockData)
 
+
+    def test_get_hooks(self):
+        finder = self.data._data_instances
+        hooks = finder.get_hooks("get_setups")
+        self.assertIs(hooks, finder.get_hooks("get_setups"))
+        count = len(hooks)
+
+        calls = []
+
+        class HooksData(TestData):
+            def get_setups(self):
+                return [(calls.append, ["setup"], {})]
+
+        hooks = finder.get_hooks("get_setups")
+        self.assertEqual(count + 1, len(hooks))
+        self.assertEqual(
+            ["get_setups"],
+            [h.__name__ for h in hooks if h.__self__.__class__ is HooksData]
+        )
+
+        # classes that don't override a hook aren't returned
+        self.assertFalse(any(
+            h.__self__.__class__ is HooksData
+            for h in finder.get_hooks("get_cleanups")
+        ))
+
+        self._callSetUp()
+        self.assertEqual(["setup"], calls)
+
+        self.data.delete_class(HooksData)
+        self.assertEqual(count, len(finder.get_hooks("get_setups")))
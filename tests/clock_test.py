@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import time
+import asyncio
+
+from . import TestCase, IsolatedAsyncioTestCase, testdata
+
+
+class VirtualClockTest(TestCase):
+    def test_sleep(self):
+        real_start = time.perf_counter()
+        with testdata.virtual_clock(start=1000.0) as clock:
+            self.assertEqual(1000.0, time.time())
+            start = time.monotonic()
+            time.sleep(60)
+            self.assertAlmostEqual(60.0, time.monotonic() - start)
+            self.assertEqual(1060.0, time.time())
+            self.assertEqual(1060 * 1_000_000_000, time.time_ns())
+
+            clock.advance(10)
+            self.assertEqual(1070.0, time.time())
+
+            with self.assertRaises(ValueError):
+                time.sleep(-1)
+
+        self.assertLess(time.perf_counter() - real_start, 1.0)
+        self.assertLess(1070.0, time.time())
+
+    def test_monotonic(self):
+        """the monotonic clocks shouldn't go backwards when the clock starts"""
+        monotonic = time.monotonic()
+        perf_counter = time.perf_counter()
+        deadline = monotonic + 30
+        with testdata.virtual_clock():
+            self.assertLessEqual(monotonic, time.monotonic())
+            self.assertLessEqual(perf_counter, time.perf_counter())
+            self.assertLessEqual(monotonic * 1_000_000_000, time.monotonic_ns())
+
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(30)
+            self.assertLessEqual(deadline, time.monotonic())
+
+    def test_wait(self):
+        real_start = time.perf_counter()
+        with testdata.virtual_clock():
+            with self.assertRaises(RuntimeError):
+                testdata.wait(lambda: False, timeout=30, interval=0.1)
+
+            values = iter(range(100))
+            self.assertEventuallyEqual(20, lambda: next(values), wait=1)
+
+            start = time.monotonic()
+            with self.assertWithin(12, 14):
+                self.assertUntilTrue(
+                    lambda: time.monotonic() - start > 12,
+                    timeout=60,
+                    interval=1,
+                )
+
+        self.assertLess(time.perf_counter() - real_start, 1.0)
+
+    def test_nested(self):
+        with testdata.virtual_clock():
+            with self.assertRaises(RuntimeError):
+                with testdata.virtual_clock():
+                    pass
+
+
+class VirtualClockAsyncTest(IsolatedAsyncioTestCase):
+    async def test_asyncio_sleep(self):
+        real_start = time.perf_counter()
+        real_loop_start = asyncio.get_running_loop().time()
+        with testdata.virtual_clock():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            self.assertLessEqual(real_loop_start, start)
+            await asyncio.sleep(30)
+            self.assertLessEqual(30, loop.time() - start)
+
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.sleep(3600), timeout=60)
+
+        self.assertLess(time.perf_counter() - real_start, 1.0)
@@ -1,10 +1,19 @@
 import os
+import sys
+import inspect
+import linecache
+import time
+import asyncio
+import threading
+import logging
 
 from testdata.compat import *
 
-from . import TestCase, testdata
+from . import TestCase, IsolatedAsyncioTestCase, testdata
 
 
+logger = logging.getLogger(__name__)
+
 class MockTest(TestCase):
     def test_mock_instance(self):
         """make sure .mock_instance() acts like .mock()"""
@@ -22,6 +31,222 @@ class MockTest(TestCase):
         self.assertTrue(isinstance(instance.bar(), int))
         self.assertEqual(3, instance.che())
 
+    def test_fast_mock(self):
+        instance = testdata.fast_mock(foo="1", bar=2, che=False)
+        self.assertEqual("1", instance.foo)
+        self.assertEqual("1", instance.foo())
+        self.assertTrue(isinstance(instance.bar, int))
+        self.assertEqual(2, instance.bar())
+        self.assertFalse(instance.che)
+        self.assertFalse(instance.che())
+        self.assertEqual("1", instance.boom.bam.foo)
+
+        instance = testdata.fast_mock(foo=ValueError())
+        with self.assertRaises(ValueError):
+            instance.foo()
+
+    def test_mock_attribute_benchmark(self):
+        count = 1000
+        for mock in [testdata.mock, testdata.fast_mock]:
+            instance = mock(foo=1)
+            # inspect.stack() used to cost milliseconds per attribute
+            with testdata.spying(inspect, "stack") as spies:
+                start = time.perf_counter()
+                for _ in range(count):
+                    instance.foo
+                per_attr = (time.perf_counter() - start) / count
+
+            self.assertEqual(0, spies["stack"].count, mock.__name__)
+            logger.info(
+                "%s: %.9f seconds per attribute",
+                mock.__name__,
+                per_attr,
+            )
+
+        # the fast mock doesn't look at the calling code at all
+        instance = testdata.fast_mock(foo=1)
+        with testdata.spying(sys, "_getframe") as sys_spies:
+            with testdata.spying(linecache, "getline") as linecache_spies:
+                for _ in range(count):
+                    instance.foo
+
+        self.assertEqual(0, sys_spies["_getframe"].count)
+        self.assertEqual(0, linecache_spies["getline"].count)
+
+    def test_spy(self):
+        spy = testdata.spy(lambda x, y=0: x + y, maxsize=10, returns=True)
+        for i in range(25):
+            self.assertEqual(i + 1, spy(i, y=1))
+
+        self.assertEqual(25, spy.count)
+        self.assertEqual(10, len(spy))
+        self.assertEqual((24,), spy.last.args)
+        self.assertEqual({"y": 1}, spy.last.kwargs)
+        self.assertEqual(25, spy.last.return_value)
+        self.assertEqual(1, spy.called_with(20, y=1))
+        self.assertEqual(0, spy.called_with(1, y=1))
+        self.assertEqual(10, sum(spy.histogram().values()))
+        self.assertLess(spy.last.timestamp, time.time() + 1)
+
+        spy = testdata.spy(maxsize=2)
+        records = list(spy.recorder.records)
+        for i in range(5):
+            self.assertIsNone(spy(i))
+        self.assertEqual(records, spy.recorder.records)
+        self.assertEqual([(3,), (4,)], [r.args for r in spy.calls()])
+
+        def boom():
+            raise ValueError("boom")
+
+        spy = testdata.spy(boom)
+        with self.assertRaises(ValueError):
+            spy()
+        self.assertIs(ValueError, spy.last.raised)
+        self.assertIsNone(spy.last.exception)
+
+        spy = testdata.spy(boom, returns=True)
+        with self.assertRaises(ValueError):
+            spy()
+        self.assertTrue(isinstance(spy.last.exception, ValueError))
+
+        instance = testdata.mock(foo=testdata.spy(lambda: 1))
+        self.assertEqual(1, instance.foo())
+        self.assertEqual(1, instance.foo.count)
+
+    def test_spying(self):
+        class Foo(object):
+            def bar(self, v):
+                return v
+
+            @classmethod
+            def che(cls, v):
+                return v
+
+            @staticmethod
+            def baz(v):
+                return v
+
+        f = Foo()
+        with testdata.spying(Foo, "bar", "che", "baz") as spies:
+            self.assertEqual(1, f.bar(1))
+            self.assertEqual(2, Foo.che(2))
+            self.assertEqual(3, f.che(3))
+            self.assertEqual(4, f.baz(4))
+
+        self.assertEqual(1, spies["bar"].count)
+        self.assertEqual((f, 1), spies["bar"].last.args)
+        self.assertEqual(2, spies["che"].count)
+        self.assertEqual(1, spies["baz"].count)
+        self.assertFalse(isinstance(Foo.__dict__["bar"], testdata.Spy))
+        self.assertTrue(isinstance(Foo.__dict__["che"], classmethod))
+
+        with testdata.spying(f, "bar") as spies:
+            f.bar(1)
+        self.assertEqual((1,), spies["bar"].last.args)
+        self.assertFalse("bar" in vars(f))
+
+        FP = testdata.patch(Foo, bar=testdata.spy(lambda self, v: v + 1))
+        self.assertEqual(2, FP().bar(1))
+        self.assertEqual(1, FP.bar.count)
+
+    def test_mock_spec(self):
+        class Foo(object):
+            che = 1
+
+            def bar(self, a, b=2):
+                return a + b
+
+            @classmethod
+            def baz(cls, a):
+                return a
+
+            @staticmethod
+            def boom(a, *, b):
+                return a + b
+
+        m = testdata.mock_spec(Foo, bar=lambda a, b=2: a * b, baz=3)
+        self.assertTrue(isinstance(m, Foo))
+        self.assertEqual(6, m.bar(3))
+        self.assertEqual(3, m.baz(1))
+        self.assertEqual(m, m.boom(1, b=2))
+        self.assertEqual(m, m.che)
+
+        with self.assertRaises(TypeError):
+            m.bar()
+
+        with self.assertRaises(TypeError):
+            m.baz(1, 2)
+
+        with self.assertRaises(TypeError):
+            m.boom(1, 2)
+
+        with self.assertRaises(AttributeError):
+            m.does_not_exist
+
+        with self.assertRaises(AttributeError):
+            testdata.mock_spec(Foo, does_not_exist=1)
+
+        m = testdata.mock_spec(Foo(), bar=ValueError, che=5)
+        self.assertEqual(5, m.che)
+        with self.assertRaises(ValueError):
+            m.bar(1)
+
+    def test_mock_spec_internals(self):
+        class Foo(object):
+            def _patch(self, v):
+                return v
+
+            def bar(self):
+                pass
+
+        m = testdata.mock_spec(Foo, bar=2)
+        self.assertEqual(2, m.bar())
+
+        with self.assertRaises(AttributeError):
+            testdata.mock_spec(Foo, _patch=1)
+
+    def test_mock_spec_magic(self):
+        class Foo(object):
+            def __call__(self, a):
+                return a
+
+            def __len__(self):
+                return 1
+
+        class Bar(object):
+            pass
+
+        m = testdata.mock_spec(Foo)
+        self.assertEqual(m, m(1))
+        self.assertEqual(0, len(m))
+        with self.assertRaises(TypeError):
+            m(1, 2, 3)
+
+        m = testdata.mock_spec(Foo, __call__=lambda a: a + 1, __len__=5)
+        self.assertEqual(2, m(1))
+        self.assertEqual(5, len(m))
+
+        m = testdata.mock_spec(Bar)
+        with self.assertRaises(TypeError):
+            m(1, 2, 3)
+
+        with self.assertRaises(TypeError):
+            len(m)
+
+        with self.assertRaises(AttributeError):
+            testdata.mock_spec(Bar, __len__=1)
+
+    def test_mock_spec_cache(self):
+        class Foo(object):
+            def bar(self, a): pass
+            def che(self, a): pass
+
+        with testdata.spying(inspect, "signature") as spies:
+            for _ in range(1000):
+                testdata.mock_spec(Foo).bar(1)
+
+        self.assertEqual(2, spies["signature"].count)
+
     def test_mock_2(self):
         instance = testdata.mock({"foo.bar.che": 1})
         self.assertEqual(1, instance.foo.bar.che)
@@ -277,6 +502,143 @@ class PatchTest(TestCase):
             morig.FOO
         self.assertEqual(1, m.FOO)
 
+    def test_patch_module_cache(self):
+        mpath = testdata.create_module([
+            "def boom():",
+            "    return 1",
+            "",
+            "def bam():",
+            "    return boom()",
+        ])
+        modnames = set()
+        codes = testdata.MockData._module_codes
+
+        for i in range(100):
+            m = testdata.patch_module(mpath, boom=lambda: 2)
+            self.assertEqual(2, m.bam())
+            modnames.add(m.__name__)
+
+            # the module is only compiled the first time it is patched
+            if i == 0:
+                code = codes[mpath][3]
+            self.assertIs(code, codes[mpath][3])
+
+        self.assertEqual(100, len(modnames))
+        for modname in modnames:
+            self.assertTrue(modname in sys.modules)
+
+        # the cleanup that runs after each test removes the patched modules
+        testdata.MockData()._cleanup_patched_modules()
+        for modname in modnames:
+            self.assertFalse(modname in sys.modules)
+
+        # changing the module means it is compiled again
+        mpath.write_text("\n".join([
+            "def boom():",
+            "    return 3",
+            "",
+            "def bam():",
+            "    return boom() + 100",
+        ]))
+        m = testdata.patch_module(mpath, boom=lambda: 2)
+        self.assertEqual(102, m.bam())
+        self.assertIsNot(code, codes[mpath][3])
+
+    def test_patch_module_memory(self):
+        mpath = testdata.create_module(
+            [
+                "def boom():",
+                "    return 1",
+            ],
+            memory=True,
+        )
+        m = testdata.patch_module(mpath, boom=lambda: 2)
+        self.assertEqual(2, m.boom())
+        self.assertEqual(1, mpath.get_module().boom())
+
+    def test_patching_module(self):
+        mpath = testdata.create_module([
+            "import os",
+            "",
+            "def boom():",
+            "    return 1",
+            "",
+            "class FooPatch(object):",
+            "    @classmethod",
+            "    def bam(cls): return boom()",
+        ])
+        m = mpath.get_module()
+        cwd = os.getcwd()
+
+        with testdata.patching(mpath, boom=2, che=3, **{"os.getcwd": "/foo"}) as pm:
+            self.assertIs(m, pm)
+            self.assertEqual(2, m.FooPatch.bam())
+            self.assertEqual(3, m.che)
+            self.assertEqual("/foo", m.os.getcwd())
+
+        self.assertEqual(1, m.FooPatch.bam())
+        self.assertFalse(hasattr(m, "che"))
+        self.assertEqual(cwd, os.getcwd())
+
+    def test_patching_class_instance(self):
+        class Foo(object):
+            che = 1
+
+            @property
+            def bar(self):
+                return 1
+
+            @classmethod
+            def baz(cls):
+                return 1
+
+            def boom(self):
+                return 1
+
+        with testdata.patching(Foo, baz=2, che=2):
+            self.assertEqual(2, Foo.baz())
+            self.assertEqual(2, Foo.che)
+
+        self.assertEqual(1, Foo.baz())
+        self.assertEqual(1, Foo.che)
+
+        f = Foo()
+        with testdata.patching(f, bar=2, boom=lambda self: 2) as pf:
+            self.assertIs(f, pf)
+            self.assertEqual(2, f.bar)
+            self.assertEqual(2, f.boom())
+            self.assertTrue(isinstance(f, Foo))
+
+        self.assertEqual(1, f.bar)
+        self.assertEqual(1, f.boom())
+        self.assertEqual(Foo, f.__class__)
+
+    def test_patching_in_place(self):
+        """patching shouldn't copy and import the module like .patch does"""
+        mpath = testdata.create_module([
+            f"def foo{i}(): return {i}" for i in range(500)
+        ])
+
+        m = mpath.get_module()
+        modcount = len(sys.modules)
+        for _ in range(100):
+            with testdata.patching(m, foo1=lambda: 0) as pm:
+                self.assertIs(m, pm)
+                self.assertEqual(0, m.foo1())
+            self.assertEqual(1, m.foo1())
+
+        self.assertEqual(modcount, len(sys.modules))
+
+    def test_patching_missing(self):
+        m = testdata.create_module().get_module()
+        patches = {"missing.getcwd": "/foo", "boom.bam.che": 1}
+        with testdata.patching(m, **patches):
+            self.assertEqual("/foo", m.missing.getcwd())
+            self.assertEqual(1, m.boom.bam.che)
+
+        self.assertFalse(hasattr(m, "missing"))
+        self.assertFalse(hasattr(m, "boom"))
+
     def test_patch_module_nested(self):
         mpath = testdata.create_module()
         morig = mpath.module()
@@ -325,6 +687,146 @@ class PatchTest(TestCase):
         self.assertEqual("barstatic 2", m.barstatic())
 
 
+class FaultInjectorTest(TestCase):
+    def test_latency(self):
+        f = testdata.inject(lambda: 1, latency=0.01)
+        start = time.perf_counter()
+        self.assertEqual(1, f())
+        self.assertLessEqual(0.01, time.perf_counter() - start)
+        self.assertLessEqual(0.01, f.last.latency)
+
+        f = testdata.inject(latency=0.01, distribution="pareto", seed=1)
+        for _ in range(10):
+            self.assertLessEqual(0.01, f.get_latency())
+
+        f = testdata.inject(latency=0.01, distribution="normal", seed=1)
+        f2 = testdata.inject(latency=0.01, distribution="normal", seed=1)
+        for _ in range(10):
+            latency = f.get_latency()
+            self.assertLessEqual(0.0, latency)
+            self.assertEqual(latency, f2.get_latency())
+
+        with self.assertRaises(ValueError):
+            testdata.inject(distribution="foo")
+
+    def test_errors(self):
+        f = testdata.inject(lambda: 1, error_rate=1.0, error=KeyError)
+        with self.assertRaises(KeyError):
+            f()
+        self.assertIs(KeyError, f.last.raised)
+
+        f = testdata.inject(lambda: 1, error_rate=0.5, seed=1)
+        errors = 0
+        for _ in range(100):
+            try:
+                f()
+
+            except ConnectionError:
+                errors += 1
+
+        self.assertTrue(20 < errors < 80)
+        self.assertEqual(100, f.count)
+
+    def test_concurrency(self):
+        f = testdata.inject(lambda: 1, latency=0.01, concurrency=2)
+        threads = [threading.Thread(target=f) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(6, f.count)
+        self.assertEqual(2, f.max_active)
+        self.assertEqual(0, f.active)
+
+        # the recorded latency includes waiting for a concurrency slot
+        f = testdata.inject(lambda: 1, latency=0.05, concurrency=1)
+        threads = [threading.Thread(target=f) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(1, f.max_active)
+        self.assertLessEqual(0.1, max(f.latencies()))
+
+        f = testdata.inject(
+            lambda: 1,
+            latency=0.05,
+            concurrency=1,
+            reject=True,
+        )
+        errors = []
+        def target():
+            try:
+                f()
+
+            except ConnectionError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=target) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(2, f.rejected)
+        self.assertEqual(2, len(errors))
+        self.assertEqual(3, f.count)
+
+    def test_async_loops(self):
+        """the same injector can be used in more than one event loop, like
+        when it is shared by IsolatedAsyncioTestCase tests"""
+        async def foo(v):
+            return v
+
+        f = testdata.inject(foo, latency=0.01, concurrency=1)
+
+        async def run():
+            return await asyncio.gather(*[f(i) for i in range(3)])
+
+        self.assertEqual([0, 1, 2], asyncio.run(run()))
+        self.assertEqual([0, 1, 2], asyncio.run(run()))
+        self.assertEqual(6, f.count)
+        self.assertEqual(1, f.max_active)
+
+    def test_patch(self):
+        class Foo(object):
+            def bar(self):
+                return 1
+
+        FP = testdata.patch(
+            Foo,
+            bar=testdata.inject(lambda self: 2, latency=0.001),
+        )
+        self.assertEqual(2, FP().bar())
+        self.assertEqual(1, FP.bar.count)
+
+
+class FaultInjectorAsyncTest(IsolatedAsyncioTestCase):
+    async def test_async(self):
+        async def foo(v):
+            return v
+
+        f = testdata.inject(foo, latency=0.01, concurrency=2)
+        if hasattr(inspect, "markcoroutinefunction"):
+            # python 3.12+
+            self.assertTrue(inspect.iscoroutinefunction(f))
+
+        start = time.perf_counter()
+        rs = await asyncio.gather(*[f(i) for i in range(6)])
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(list(range(6)), rs)
+        self.assertEqual(2, f.max_active)
+        self.assertLessEqual(0.03, elapsed)
+        self.assertEqual(6, f.count)
+
+        f = testdata.inject(foo, error_rate=1.0)
+        with self.assertRaises(ConnectionError):
+            await f(1)
+
+
 class EnvironTest(TestCase):
     def test_environment(self):
         self.assertFalse("TDT_ENVIRON_VAL" in os.environ)
@@ -3,15 +3,25 @@ import os
 import importlib
 from collections import OrderedDict
 import inspect
+import time
+import zipfile
+import tarfile
+import gzip
+import zlib
+import logging
 
 from testdata.path import (
     TempModulepath,
+    TempModuleFinder,
 )
 from testdata.compat import *
 
 from . import TestCase, testdata
 
 
+logger = logging.getLogger(__name__)
+
+
 class CSVTest(TestCase):
     def test_csv_no_callback(self):
         """Turns out, the csv writer didn't write anything in py3"""
@@ -134,6 +144,40 @@ class CSVTest(TestCase):
             self.assertTrue("bar" in row)
 
 
+    def test_create_csv_rows(self):
+        p = testdata.create_csv(
+            {"foo": testdata.get_int, "bar": "bar"},
+            rows=2500,
+            batch_size=100,
+        )
+        rows = p.tolist()
+        self.assertEqual(2500, len(rows))
+        self.assertEqual("bar", rows[-1]["bar"])
+
+    def test_create_csv_processes(self):
+        p = testdata.create_csv(
+            {"foo": testdata.get_int, "bar": [1, 2, 3]},
+            rows=100,
+            processes=2,
+        )
+        rows = p.tolist()
+        self.assertEqual(100, len(rows))
+        self.assertEqual("3", rows[2]["bar"])
+        self.assertEqual("", rows[3]["bar"])
+        self.assertNotEqual(rows[0]["foo"], rows[50]["foo"])
+
+        lines = p.read_text().splitlines()
+        self.assertEqual("foo,bar", lines[0])
+        self.assertEqual(101, len(lines))
+
+    def test_get_csv(self):
+        s = testdata.get_csv({"foo": 1, "bar": 2})
+        self.assertEqual("foo,bar\r\n1,2\r\n", s)
+
+        s = testdata.get_csv({"foo": testdata.get_int}, rows=5, header=False)
+        self.assertEqual(5, len(s.splitlines()))
+
+
 class ContentTest(TestCase):
     def test_find(self):
         basedir = testdata.create_files({
@@ -150,6 +194,43 @@ class ContentTest(TestCase):
         self.assertTrue(f.endswith("bam.txt"))
         self.assertTrue("che" in f)
 
+    def test_find_index(self):
+        basedir = testdata.create_files({
+            "foo.tar.gz": "foo",
+            "che/bar.txt": "bar",
+        })
+
+        f = testdata.find_data_file("foo", basedir)
+        self.assertTrue(f.endswith("foo.tar.gz"))
+        f = testdata.find_data_file("foo.tar", basedir)
+        self.assertTrue(f.endswith("foo.tar.gz"))
+        f = testdata.find_data_file("bar", basedir)
+        self.assertTrue(f.endswith("che/bar.txt"))
+
+        with self.assertRaises(IOError):
+            testdata.find_data_file("baz", basedir)
+
+        # adding a file changes the directory mtime which invalidates the
+        # index
+        basedir.add_file("che/baz.txt", "baz")
+        f = testdata.find_data_file("baz", basedir)
+        self.assertTrue(f.endswith("che/baz.txt"))
+
+    def test_find_data_cache(self):
+        basedir = testdata.create_files({
+            "foo.txt": "foo",
+        })
+
+        self.assertEqual(b"foo", testdata.find_data("foo", basedir))
+        self.assertEqual("foo", testdata.find_data("foo", basedir, "UTF-8"))
+
+        f = testdata.find_data_file("foo", basedir)
+        f.write_text("foobar")
+        self.assertEqual(b"foobar", testdata.find_data("foo", basedir))
+
+        with testdata.environ(TESTDATA_DATA_CACHE_FILE_SIZE="1"):
+            self.assertEqual(b"foobar", testdata.find_data("foo", basedir))
+
     def test_contents_decode_error(self):
         base_d = testdata.create_files({
             "bytes.txt": testdata.get_words(),
@@ -249,6 +330,83 @@ class FilepathTest(TestCase):
             count += 1
         self.assertEqual(1, count)
 
+    def test_create_large_file(self):
+        size = 3 * 1024 * 1024 + 7
+        for content in ["zeros", "sparse", "random", "compressible"]:
+            start = time.perf_counter()
+            f = testdata.create_large_file(size, content, chunk_size=65536)
+            stop = time.perf_counter()
+            self.assertEqual(size, os.path.getsize(f))
+
+            mbs = (size / 1048576) / max(stop - start, 1e-9)
+            logger.info(f"create_large_file {content}: {mbs:.1f} MB/s")
+
+        f = testdata.create_large_file(1024, "zeros")
+        self.assertEqual(b"\x00" * 1024, f.read_bytes())
+
+        with self.assertRaises(ValueError):
+            testdata.create_large_file(1024, "foo")
+
+    def test_create_large_file_ratio(self):
+        size = 300000
+        b1 = testdata.create_large_file(size, "compressible").read_bytes()
+        b2 = testdata.create_compressible_file(size).read_bytes()
+        self.assertAlmostEqual(
+            len(zlib.compress(b1)) / size,
+            len(zlib.compress(b2)) / size,
+            delta=0.03
+        )
+
+    def test_create_compressible_file(self):
+        f = testdata.create_compressible_file(300000, 0.4)
+        b = f.read_bytes()
+        self.assertEqual(300000, len(b))
+        self.assertAlmostEqual(0.4, len(zlib.compress(b)) / len(b), delta=0.03)
+
+    def test_create_archive_zip(self):
+        f = testdata.create_archive(5, total_size=10000, content="text")
+        self.assertTrue(f.endswith(".zip"))
+        with zipfile.ZipFile(f) as zf:
+            infos = zf.infolist()
+            self.assertEqual(5, len(infos))
+            self.assertEqual(10000, sum(i.file_size for i in infos))
+
+        f = testdata.create_archive(
+            1,
+            total_size=1024 * 1024,
+            content="zeros",
+        )
+        with zipfile.ZipFile(f) as zf:
+            info = zf.infolist()[0]
+            self.assertLess(info.compress_size * 100, info.file_size)
+
+    def test_create_archive_tar(self):
+        f = testdata.create_archive(
+            {
+                "foo/bar.txt": "bar",
+                "che.bin": (b"1" for _ in range(10)),
+                "baz.txt": lambda: "baz",
+            },
+            format="tar.gz",
+        )
+        self.assertTrue(f.endswith(".tar.gz"))
+        with tarfile.open(f) as tf:
+            self.assertEqual(b"bar", tf.extractfile("foo/bar.txt").read())
+            self.assertEqual(b"1" * 10, tf.extractfile("che.bin").read())
+            self.assertEqual(b"baz", tf.extractfile("baz.txt").read())
+
+        f = testdata.create_archive(3, format="tar")
+        with tarfile.open(f) as tf:
+            self.assertEqual(3, len(tf.getmembers()))
+
+    def test_create_archive_gz(self):
+        f = testdata.create_archive({"foo": "foo"}, format="gz")
+        with gzip.open(f) as fp:
+            self.assertEqual(b"foo", fp.read())
+
+        with self.assertRaises(ValueError):
+            testdata.create_archive({"foo": "1", "bar": "2"}, format="gz")
+
 
 class DirpathTest(TestCase):
     def test_get_dir(self):
@@ -304,8 +462,13 @@ class ModulepathTest(TestCase):
         m3 = testdata.create_module([
             "class Foo(object): pass",
         ])
+        m4 = testdata.create_module([
+            "class Foo(object): pass",
+        ], tmpdir=testdata.create_dir())
         self.assertEqual(m.directory, m2.directory)
-        self.assertNotEqual(m.directory, m3.directory)
+        # modules without a tmpdir share the session's import directory
+        self.assertEqual(m.directory, m3.directory)
+        self.assertNotEqual(m.directory, m4.directory)
         self.assertNotEqual(m, m2)
         self.assertNotEqual(m, m3)
 
@@ -329,6 +492,171 @@ class ModulepathTest(TestCase):
         self.assertEqual(m.module().__file__, m.path)
         self.assertTrue(m.relpath.endswith(".py"))
 
+    def test_create_module_memory(self):
+        syspath_count = len(sys.path)
+        modpath = testdata.get_module_name(2)
+        m = testdata.create_module([
+            "import inspect",
+            "class Foo(object):",
+            "    def bar(self):",
+            "        return 1",
+        ], modpath, memory=True)
+        self.assertEqual(syspath_count, len(sys.path))
+        self.assertEqual(modpath, m)
+        self.assertFalse(m.is_package())
+        self.assertFalse(os.path.exists(m.path))
+
+        mod = m.get_module()
+        self.assertEqual(1, mod.Foo().bar())
+        self.assertEqual(m.path, mod.__file__)
+        self.assertTrue(mod.__name__ in sys.modules)
+        self.assertTrue("def bar(self)" in inspect.getsource(mod.Foo))
+
+        # the parent was created as a package
+        parent = importlib.import_module(m.modparts[0])
+        self.assertTrue(hasattr(parent, "__path__"))
+
+        # recreating the module replaces the old one
+        m = testdata.create_module("class Che(object): pass", modpath, memory=True)
+        mod = m.get_module()
+        self.assertTrue(hasattr(mod, "Che"))
+        self.assertFalse(hasattr(mod, "Foo"))
+
+        classes = testdata.create_module_classes(
+            "class Baz(object): pass",
+            memory=True
+        )
+        self.assertTrue("Baz" in classes)
+
+    def test_create_modules_memory(self):
+        prefix = testdata.get_module_name()
+        d = testdata.create_modules({
+            "foo": "class Foo(object): pass",
+            "foo.bar": "class Bar(object): pass",
+            "che": "class Che(object): pass",
+        }, prefix, memory=True)
+
+        modnames = set(mp for mp in d.modpaths())
+        self.assertEqual(
+            set([
+                prefix,
+                f"{prefix}.foo",
+                f"{prefix}.foo.bar",
+                f"{prefix}.che",
+            ]),
+            modnames,
+        )
+        self.assertTrue(d.modpath(f"{prefix}.foo").is_package())
+        self.assertTrue(hasattr(d.get_module(f"{prefix}.foo.bar"), "Bar"))
+        self.assertEqual(4, len(list(d.modpath(prefix).get_modules())))
+
+    def test_create_module_memory_run(self):
+        m = testdata.create_module(
+            "print('hello from memory')",
+            memory=True,
+        )
+        r = m.run()
+        self.assertTrue("hello from memory" in r)
+
+    def test_create_module_classes_cache(self):
+        data = [
+            "class Foo(object):",
+            "    def bar(self):",
+            "        return 1",
+        ]
+        for memory in [True, False]:
+            c1 = testdata.create_module_class(data, memory=memory)
+            info = testdata.get_module_cache_info()
+            start = time.perf_counter()
+            c2 = testdata.create_module_class(data, memory=memory)
+            stop = time.perf_counter()
+            info2 = testdata.get_module_cache_info()
+            logger.info(
+                "memory=%s cached module class: %.6f seconds",
+                memory,
+                stop - start,
+            )
+
+            self.assertEqual(info["hits"] + 1, info2["hits"])
+            self.assertEqual(info["misses"], info2["misses"])
+
+            self.assertNotEqual(c1, c2)
+            self.assertNotEqual(c1.__module__, c2.__module__)
+            self.assertEqual(1, c2().bar())
+            self.assertEqual(
+                sys.modules[c2.__module__].__file__,
+                c2.bar.__code__.co_filename,
+            )
+
+    def test_create_module_classes_disk(self):
+        c = testdata.create_module_class([
+            "import os",
+            "class Foo(object):",
+            "    basedir = os.path.dirname(__file__)",
+        ])
+        self.assertTrue(os.path.isdir(c.basedir))
+        self.assertTrue(os.path.isfile(inspect.getsourcefile(c)))
+
+    def test_create_module_cleanup(self):
+        finder = TempModuleFinder.get_instance()
+        marker = finder.get_marker()
+
+        m = testdata.create_module("x = 1")
+        self.assertEqual(1, m.get_module().x)
+        self.assertTrue(m in sys.modules)
+
+        finder.cleanup(marker)
+        self.assertFalse(m in sys.modules)
+        with self.assertRaises(ImportError):
+            importlib.import_module(m)
+
+    def test_create_module_import_root(self):
+        """sys.path shouldn't grow as modules are created, so imports
+        shouldn't get slower"""
+        def import_missing():
+            start = time.perf_counter()
+            for _ in range(10):
+                with self.assertRaises(ImportError):
+                    importlib.import_module(testdata.get_module_name())
+            return (time.perf_counter() - start) / 10
+
+        root = TempModuleFinder.get_instance().get_import_root()
+        syspath_count = len(sys.path)
+        before = import_missing()
+
+        # set this to 5000 or more to see how imports do in a big test run
+        count = int(os.environ.get("TESTDATA_TEST_MODULE_COUNT", 500))
+        for _ in range(count):
+            m = testdata.create_module("x = 1")
+        self.assertEqual(root, m.basedir)
+        self.assertEqual(syspath_count, len(sys.path))
+
+        after = import_missing()
+        m = testdata.create_module("x = 2")
+        self.assertEqual(2, m.get_module().x)
+        self.assertIsNotNone(importlib.machinery.PathFinder.find_spec(m))
+
+        logger.info(
+            f"Missing module import after {count} modules:"
+            f" {after:.6f}s, before: {before:.6f}s"
+        )
+
+    def test_create_module_reuse_name(self):
+        """modules in the import root can be created again with new source"""
+        modpath = testdata.get_module_name(2)
+        m = testdata.create_module("x = 1", modpath)
+        self.assertEqual(1, m.get_module().x)
+
+        m = testdata.create_module("x = 2", modpath)
+        self.assertEqual(2, m.get_module().x)
+
+        finder = TempModuleFinder.get_instance()
+        marker = finder.get_marker()
+        m = testdata.create_module("x = 3", modpath=testdata.get_module_name())
+        self.assertTrue(os.path.isfile(m.path))
+        finder.cleanup(marker)
+        self.assertFalse(os.path.isfile(m.path))
+
     def test_create_module_2(self):
         ts = [
             (
@@ -480,6 +808,63 @@ class ModulepathTest(TestCase):
         klasses = list(mp.classes())
         self.assertEqual(5, len(klasses))
 
+    def test_modpaths_index(self):
+        prefix = testdata.get_module_name()
+        mpath = testdata.create_modules({
+            "foo.bar": "class Bar(object): pass",
+            "che": "raise ValueError('should not be imported')",
+        }, prefix)
+        self.assertEqual(4, len(list(mpath.modpaths())))
+
+        # modules created with create_module are added to the existing index
+        testdata.create_module(
+            "class Baz(object): pass",
+            f"{prefix}.foo.baz",
+            tmpdir=mpath,
+        )
+        mps = list(mpath.modpaths())
+        self.assertEqual(5, len(mps))
+        self.assertTrue(f"{prefix}.foo.baz" in mps)
+
+        # modules written some other way make the index stale
+        testdata.create_file(
+            "class Boom(object): pass",
+            f"{prefix}/foo/boom.py",
+            tmpdir=mpath,
+        )
+        self.assertTrue(f"{prefix}.foo.boom" in list(mpath.modpaths()))
+
+        # a module written some other way isn't lost when a module is then
+        # created with create_module
+        testdata.create_file(
+            "class Bang(object): pass",
+            f"{prefix}/foo/bang.py",
+            tmpdir=mpath,
+        )
+        testdata.create_module(
+            "class Bam(object): pass",
+            f"{prefix}.foo.bam",
+            tmpdir=mpath,
+        )
+        mps = list(mpath.modpaths())
+        self.assertTrue(f"{prefix}.foo.bang" in mps)
+        self.assertTrue(f"{prefix}.foo.bam" in mps)
+
+        # only the modules under the prefix are imported
+        mp = mpath.modpath(f"{prefix}.foo")
+        modnames = [m.__name__ for m in mp.get_modules()]
+        self.assertEqual(
+            [
+                f"{prefix}.foo",
+                f"{prefix}.foo.bam",
+                f"{prefix}.foo.bang",
+                f"{prefix}.foo.bar",
+                f"{prefix}.foo.baz",
+                f"{prefix}.foo.boom",
+            ],
+            modnames,
+        )
+
     def test_create_modules_2(self):
         ts = [
             OrderedDict([
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import asyncio
+import pstats
+import cProfile
+import unittest
+
+from testdata.profiling import SamplingProfiler, Profiler
+
+from . import TestCase, IsolatedAsyncioTestCase, testdata
+
+
+def busy(seconds):
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        pass
+
+
+class SamplingProfilerTest(TestCase):
+    def test_sample(self):
+        with SamplingProfiler(interval=0.001) as p:
+            busy(0.1)
+
+        self.assertLess(0, p.samples)
+        name, count = p.top(1)[0]
+        self.assertTrue(name.startswith("busy (profiling_test.py"))
+
+        path = testdata.get_file("foo.collapsed")
+        p.write(path)
+        line = path.read_text().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        self.assertTrue(";busy (" in stack)
+        self.assertLess(0, int(count))
+
+
+class ProfilerTest(TestCase):
+    def test_get_mode(self):
+        self.assertEqual("", Profiler.get_mode(""))
+        self.assertEqual("", Profiler.get_mode("0"))
+        self.assertEqual("cprofile", Profiler.get_mode("1"))
+        self.assertEqual("cprofile", Profiler.get_mode(True))
+        self.assertEqual("sample", Profiler.get_mode("sampling"))
+
+    def test_cprofile(self):
+        basedir = testdata.create_dir()
+        with Profiler("cprofile", basedir=basedir, count=3) as p:
+            busy(0.01)
+
+        path = p.write("foo.bar")
+        self.assertTrue(path.endswith("foo.bar.pstats"))
+        self.assertLess(0, pstats.Stats(path).total_calls)
+        self.assertTrue("busy" in p.summary())
+
+    def test_decorator(self):
+        basedir = testdata.create_dir()
+
+        class _ProfiledTest(TestCase):
+            @TestCase.profile_test("sample")
+            def test_foo(self):
+                busy(0.05)
+
+            @testdata.profile_test
+            def test_bar(self):
+                busy(0.01)
+
+            def test_che(self):
+                pass
+
+        with testdata.environ(TESTDATA_PROFILE_DIR=basedir):
+            with testdata.capture(passthrough=False) as c:
+                for name in ["test_foo", "test_bar", "test_che"]:
+                    _ProfiledTest(name).run(unittest.TestResult())
+
+        names = set(os.listdir(basedir))
+        self.assertEqual(2, len(names))
+        self.assertTrue(any(n.endswith("test_foo.collapsed") for n in names))
+        self.assertTrue(any(n.endswith("test_bar.pstats") for n in names))
+        self.assertTrue("samples" in c)
+
+    def test_active_profiler(self):
+        """a test shouldn't error if another profiler is already active"""
+        basedir = testdata.create_dir()
+
+        class _ProfiledTest(TestCase):
+            @testdata.profile_test
+            def test_foo(self):
+                busy(0.01)
+
+        outer = cProfile.Profile()
+        with testdata.environ(TESTDATA_PROFILE_DIR=basedir):
+            with testdata.capture(passthrough=False) as c:
+                outer.enable()
+                try:
+                    result = unittest.TestResult()
+                    _ProfiledTest("test_foo").run(result)
+
+                finally:
+                    outer.disable()
+
+        self.assertTrue(result.wasSuccessful())
+        if sys.version_info >= (3, 12):
+            # only 3.12+ refuses to enable a second profiler
+            self.assertEqual([], os.listdir(basedir))
+            self.assertTrue("Not profiling" in c)
+
+    def test_environ(self):
+        basedir = testdata.create_dir()
+
+        class _ProfiledTest(IsolatedAsyncioTestCase):
+            async def test_foo(self):
+                await asyncio.sleep(0.01)
+
+        environ = {"TESTDATA_PROFILE_DIR": basedir, "TESTDATA_PROFILE": "1"}
+        with testdata.environ(**environ):
+            with testdata.capture(passthrough=False):
+                _ProfiledTest("test_foo").run(unittest.TestResult())
+
+        names = os.listdir(basedir)
+        self.assertEqual(1, len(names))
+        self.assertTrue(names[0].endswith("test_foo.pstats"))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+
+from testdata.runner import ParallelSuite, ParallelResult, get_tests, main
+
+from . import TestCase, testdata
+
+
+class ParallelSuiteTest(TestCase):
+    def create_tests(self):
+        modpath = testdata.create_modules({
+            "foo_test": [
+                "import random",
+                "from testdata import TestCase",
+                "from testdata.config import environ",
+                "",
+                "class FooTest(TestCase):",
+                "    def test_worker(self):",
+                "        self.assertNotEqual('', environ.WORKER)",
+                "        self.assertTrue('testdata-worker' in environ.TEMPDIR)",
+                "",
+                "    def test_random(self):",
+                "        self.fail(str(random.random()))",
+                "",
+                "class CheTest(TestCase):",
+                "    @classmethod",
+                "    def setUpClass(cls):",
+                "        cls.value = random.random()",
+                "",
+                "    def test_class_random(self):",
+                "        self.fail(str(self.value))",
+                "",
+                "class BarTest(TestCase):",
+                "    @TestCase.skip('bar skip')",
+                "    def test_skip(self):",
+                "        pass",
+                "",
+                "    def test_error(self):",
+                "        raise ValueError('bar error')",
+            ],
+        })
+        return get_tests(["foo_test"])
+
+    def run_suite(self, tests, **kwargs):
+        suite = ParallelSuite(tests, **kwargs)
+        stream = unittest.runner._WritelnDecorator(io.StringIO())
+        result = ParallelResult(stream, True, 0)
+        suite(result)
+        return result
+
+    def test_run(self):
+        tests = self.create_tests()
+        suite = ParallelSuite(tests, jobs=2)
+        self.assertEqual(3, len(suite.units))
+        self.assertEqual(5, suite.countTestCases())
+
+        result = self.run_suite(tests, jobs=2)
+        self.assertEqual(5, result.testsRun)
+        self.assertEqual(2, len(result.failures))
+        self.assertEqual(1, len(result.errors))
+        self.assertEqual(1, len(result.skipped))
+        self.assertEqual("bar skip", result.skipped[0][1])
+        self.assertTrue("bar error" in result.errors[0][1])
+        self.assertTrue(
+            any("test_random" in f[0].id() for f in result.failures)
+        )
+
+        self.assertTrue("foo_test.FooTest.test_random" in self.timings.tests)
+
+    def test_seed(self):
+        tests = self.create_tests()
+        r1 = self.run_suite(tests, jobs=2, seed="foo")
+        r2 = self.run_suite(tests, jobs=1, seed="foo")
+        r3 = self.run_suite(tests, jobs=2, seed="bar")
+
+        def get_failures(result):
+            return {t.id(): detail for t, detail in result.failures}
+
+        f1 = get_failures(r1)
+        f2 = get_failures(r2)
+        f3 = get_failures(r3)
+        self.assertEqual(2, len(f1))
+        for test_id in f1:
+            # this includes the random value set in setUpClass
+            self.assertEqual(f1[test_id], f2[test_id])
+            self.assertNotEqual(f1[test_id], f3[test_id])
+
+    def test_spawn(self):
+        """workers that aren't forked can still import the created modules"""
+        tests = self.create_tests()
+        result = self.run_suite(tests, jobs=2, context="spawn")
+        self.assertEqual(5, result.testsRun)
+        self.assertEqual(1, len(result.errors))
+        self.assertTrue("bar error" in result.errors[0][1])
+
+    def test_main(self):
+        modpath = testdata.create_module(
+            [
+                "from testdata import TestCase",
+                "",
+                "class FooTest(TestCase):",
+                "    def test_foo(self):",
+                "        pass",
+            ],
+            modpath="bar_test",
+        )
+
+        with testdata.capture(passthrough=False) as c:
+            self.assertEqual(0, main(["-j", "2", "--seed", "che", "bar_test"]))
+        self.assertTrue("seed che" in c)
+        self.assertTrue("Ran 1 test" in c)
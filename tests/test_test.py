@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 import logging
+import asyncio
 import time
+import json
+import unittest
 
 from testdata.compat import *
 from testdata.base import TestData
+from testdata.test import Timings
 
-from . import TestCase, testdata
+from . import TestCase, IsolatedAsyncioTestCase, testdata
 
 
 class AssertTest(TestCase):
@@ -33,11 +37,218 @@ class AssertTest(TestCase):
             with self.assertWithin(0.25):
                 time.sleep(0.3)
 
+    def test_assert_benchmark(self):
+        stats = self.assertBenchmark(lambda: sum(range(100)), rounds=20)
+        self.assertEqual(20, stats["rounds"])
+        for k in ["mean", "median", "p95", "p99", "stddev"]:
+            self.assertTrue(k in stats)
+        self.assertLessEqual(stats["median"], stats["p99"])
+
+        with self.assertRaises(AssertionError):
+            self.assertBenchmark(
+                lambda: time.sleep(0.01),
+                max_median=0.001,
+                rounds=5,
+                warmup=0,
+            )
+
+        stats = self.assertBenchmark(lambda: None, min_time=0.01)
+        self.assertLessEqual(5, stats["rounds"])
+
+    def test_assert_benchmark_baseline(self):
+        baseline = testdata.get_file("baseline.json")
+        self.assertBenchmark(
+            lambda: None,
+            rounds=10,
+            baseline=baseline,
+            name="foo",
+        )
+        self.assertTrue("foo" in json.loads(baseline.read_text()))
+
+        baseline.write_text(json.dumps({"foo": {"median": 0.0, "p99": 0.0}}))
+        with self.assertRaises(AssertionError):
+            self.assertBenchmark(
+                lambda: time.sleep(0.001),
+                rounds=5,
+                baseline=baseline,
+                name="foo",
+            )
+
+    def test_assert_max_memory(self):
+        with self.assertMaxMemory(1024 * 1024):
+            sum(range(100))
+
+        with self.assertRaises(AssertionError) as cm:
+            with self.assertMaxMemory(1024 * 1024):
+                b = bytearray(2 * 1024 * 1024)
+        self.assertTrue("test_test.py" in str(cm.exception))
+
+        # a freed allocation still counts towards the peak
+        with self.assertRaises(AssertionError):
+            with self.assertMaxMemory(1024 * 1024):
+                bytearray(2 * 1024 * 1024)
+
+    def test_assert_no_leak(self):
+        self.assertNoLeak(lambda: testdata.get_words(5))
+
+        cache = []
+        with self.assertRaises(AssertionError) as cm:
+            self.assertNoLeak(lambda: cache.append(bytearray(100)))
+        self.assertTrue("test_test.py" in str(cm.exception))
+
+    def test_assert_cpu_within(self):
+        # sleeping doesn't use any cpu
+        with self.assertCPUWithin(0.1) as stats:
+            time.sleep(0.2)
+        self.assertLess(stats["cpu"], 0.1)
+        self.assertTrue("context_switches" in stats)
+        self.assertTrue("page_faults" in stats)
+
+        with self.assertRaises(AssertionError):
+            with self.assertCPUWithin(0.01):
+                start = time.process_time()
+                while time.process_time() - start < 0.05:
+                    pass
+
+        with self.assertRaises(AssertionError):
+            with self.assertThreadCPUWithin(0.01):
+                start = time.thread_time()
+                while time.thread_time() - start < 0.05:
+                    pass
+
+        with self.assertRaises(AssertionError):
+            with self.assertCPUWithin(max_context_switches=0):
+                for _ in range(5):
+                    time.sleep(0.001)
+
     def test_assert_regex(self):
         self.assertRegex("foo", r"^foo$")
         self.assertNotRegex("bar", r"^foo$")
 
 
+class DataAttrsTest(TestCase):
+    def test_cache(self):
+        get_int = self.get_int
+        self.assertTrue(get_int is self.get_int)
+        self.assertTrue("get_int" in type(self)._data_attrs[1])
+        self.assertTrue(self.get_int is type(self).get_int)
+
+        class _OtherTest(TestCase):
+            pass
+        self.assertFalse("_data_attrs" in _OtherTest.__dict__)
+
+    def test_invalidate(self):
+        class CacheFooData(TestData):
+            def get_cache_foo(self):
+                return 1
+
+        self.assertEqual(1, self.get_cache_foo())
+
+        class CacheFooChildData(CacheFooData):
+            def get_cache_foo(self):
+                return 2
+
+        self.assertEqual(2, self.get_cache_foo())
+
+        self.data.delete_class(CacheFooChildData)
+        self.data.delete_class(CacheFooData)
+        with self.assertRaises(AttributeError):
+            self.get_cache_foo()
+
+    def test_patched(self):
+        from testdata.types.string import StringData
+
+        self.assertNotEqual("PATCHED", self.get_words())
+        with testdata.patching(StringData, get_words=lambda s: "PATCHED"):
+            self.assertEqual("PATCHED", self.get_words())
+            self.assertEqual("PATCHED", testdata.get_words())
+        self.assertNotEqual("PATCHED", self.get_words())
+
+        instance = self.get_words.__self__
+        with testdata.patching(instance, get_words=lambda s: "PATCHED"):
+            self.assertEqual("PATCHED", self.get_words())
+        self.assertNotEqual("PATCHED", self.get_words())
+
+    def test_cache_hit(self):
+        self.get_int
+        with testdata.spying(TestData, "__findattr__") as spies:
+            for _ in range(100):
+                self.get_int
+        self.assertEqual(0, spies["__findattr__"].count)
+
+        self.data.delete_class(type("CacheHitData", (TestData,), {}))
+        with testdata.spying(TestData, "__findattr__") as spies:
+            self.get_int
+        self.assertEqual(1, spies["__findattr__"].count)
+
+
+class TimingsTest(TestCase):
+    def test_timings(self):
+        class _TimedTest(TestCase):
+            def setUp(self):
+                time.sleep(0.01)
+
+            def test_foo(self):
+                self.addCleanup(time.sleep, 0.01)
+                time.sleep(0.02)
+
+        test = _TimedTest("test_foo")
+        test.run(unittest.TestResult())
+
+        timing = self.timings.tests[test.id()]
+        self.assertLessEqual(10_000_000, timing["setUp"])
+        self.assertLessEqual(20_000_000, timing["test"])
+        self.assertLessEqual(10_000_000, timing["cleanups"])
+        self.assertTrue("data_setups" in timing)
+        self.assertTrue("data_cleanups" in timing)
+
+    def test_async_timings(self):
+        class _TimedTest(IsolatedAsyncioTestCase):
+            async def test_foo(self):
+                await asyncio.sleep(0.02)
+
+        test = _TimedTest("test_foo")
+        test.run(unittest.TestResult())
+        self.assertLessEqual(20_000_000, self.timings.tests[test.id()]["test"])
+
+    def test_failure_traceback(self):
+        """the timing wrappers shouldn't hide the failing line of the test"""
+        class _FailTest(TestCase):
+            def test_fail(self):
+                self.assertEqual(1, 2)
+
+            def test_cleanup(self):
+                self.addCleanup(self.fail, "cleanup")
+
+        result = unittest.TestResult()
+        for name in ["test_fail", "test_cleanup"]:
+            _FailTest(name).run(result)
+
+        self.assertEqual(2, len(result.failures))
+        line = _FailTest.test_fail.__code__.co_firstlineno + 1
+        tb = result.failures[0][1]
+        self.assertTrue(f'File "{__file__}", line {line}' in tb, tb)
+        self.assertTrue("self.assertEqual(1, 2)" in tb, tb)
+        for _, tb in result.failures:
+            self.assertFalse("testdata/case.py" in tb, tb)
+
+    def test_slowest(self):
+        timings = Timings()
+        timings.record("foo", {"test": 1_000_000_000})
+        timings.record("bar", {"setUp": 2_000_000_000, "test": 1})
+        timings.record("che", {"test": 3})
+
+        slowest = timings.slowest(2)
+        self.assertEqual(["bar", "foo"], [t["id"] for t in slowest])
+        self.assertEqual(2.0, slowest[0]["setUp"])
+
+        path = testdata.get_file("timings.json")
+        report = json.loads(timings.to_json(path, 1))
+        self.assertEqual(3, report["count"])
+        self.assertEqual(1, len(report["slowest"]))
+        self.assertEqual(report, json.loads(path.read_text()))
+
+
 @TestCase.skip()
 class Skip1Test(TestCase):
     def test_foo(self):
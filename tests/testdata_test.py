@@ -9,13 +9,77 @@ python -m unittest test_testdata[.ClassTest[.test_method]]
 """
 from __future__ import unicode_literals, division, print_function, absolute_import
 import time
+import threading
+import asyncio
 
 from testdata.compat import *
 
-from . import TestCase, testdata
+from . import TestCase, IsolatedAsyncioTestCase, testdata
 
 
 class TestdataTest(TestCase):
+    def test_wait_backoff(self):
+        start = time.monotonic()
+        def callback():
+            return (time.monotonic() - start) > 0.005
+
+        testdata.wait(callback, interval=1.0)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        spy = testdata.spy(lambda: False)
+        with self.assertRaises(RuntimeError):
+            testdata.wait(spy, timeout=0.2, interval=0.1, backoff=1.0)
+        self.assertLess(spy.count, 5)
+
+        intervals = testdata.TestdataData()._get_wait_intervals(
+            1.0,
+            min_interval=0.1,
+            jitter=0.1,
+        )
+        for expected in [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]:
+            delay = next(intervals)
+            self.assertTrue(expected * 0.9 <= delay <= expected * 1.1)
+
+    def test_wait_event(self):
+        for event in [threading.Event(), threading.Condition()]:
+            ready = []
+            def target():
+                time.sleep(0.05)
+                ready.append(1)
+                if hasattr(event, "notify"):
+                    with event:
+                        event.notify_all()
+
+                else:
+                    event.set()
+
+            t = threading.Thread(target=target)
+            t.start()
+
+            start = time.monotonic()
+            testdata.wait(lambda: ready, interval=10, backoff=1, event=event)
+            self.assertLess(time.monotonic() - start, 5)
+            t.join()
+
+    def test_wait_event_set(self):
+        """an event that stays set shouldn't make wait spin"""
+        event = threading.Event()
+        event.set()
+        calls = []
+        def callback():
+            calls.append(1)
+            return False
+
+        with self.assertRaises(RuntimeError):
+            testdata.wait(
+                callback,
+                timeout=0.2,
+                interval=0.05,
+                backoff=1,
+                event=event,
+            )
+        self.assertLess(len(calls), 20)
+
     def test_wait(self):
         start = time.time()
         def callback():
@@ -30,3 +94,52 @@ class TestdataTest(TestCase):
         with self.assertRaises(RuntimeError):
             testdata.wait(callback, timeout=0.5)
 
+
+
+class TestdataAsyncTest(IsolatedAsyncioTestCase):
+    async def test_async_wait(self):
+        start = time.monotonic()
+        async def callback():
+            return (time.monotonic() - start) > 0.01
+
+        await testdata.async_wait(callback, interval=1.0)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        with self.assertRaises(RuntimeError):
+            await testdata.async_wait(lambda: False, timeout=0.1)
+
+        event = asyncio.Event()
+        ready = []
+        async def setter():
+            await asyncio.sleep(0.05)
+            ready.append(1)
+            event.set()
+
+        task = asyncio.create_task(setter())
+        start = time.monotonic()
+        await testdata.async_wait(
+            lambda: ready,
+            interval=10,
+            backoff=1,
+            event=event
+        )
+        self.assertLess(time.monotonic() - start, 5)
+        await task
+
+    async def test_async_wait_event_set(self):
+        event = asyncio.Event()
+        event.set()
+        calls = []
+        def callback():
+            calls.append(1)
+            return False
+
+        with self.assertRaises(RuntimeError):
+            await testdata.async_wait(
+                callback,
+                timeout=0.2,
+                interval=0.05,
+                backoff=1,
+                event=event,
+            )
+        self.assertLess(len(calls), 20)
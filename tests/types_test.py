@@ -3,6 +3,7 @@ import string
 from collections import Counter
 import datetime
 import time
+import zlib
 
 from testdata.compat import *
 
@@ -117,6 +118,18 @@ class StringTest(TestCase):
         s = testdata.get_url("foo", "bar")
         self.assertTrue(s.endswith("/foo/bar"))
 
+    def test_get_compressible_bytes(self):
+        for ratio in [0.1, 0.3, 0.75]:
+            b = testdata.get_compressible_bytes(200000, ratio)
+            self.assertEqual(200000, len(b))
+
+            actual = len(zlib.compress(b)) / len(b)
+            self.assertAlmostEqual(ratio, actual, delta=0.03)
+
+        chunks = list(testdata.get_compressible_chunks(1000, chunk_size=300))
+        self.assertEqual(4, len(chunks))
+        self.assertEqual(1000, sum(len(c) for c in chunks))
+
 
 class NumberTest(TestCase):
     def test_get_range(self):